@@ -0,0 +1,10 @@
+-- persistent accent webhook cache --
+
+CREATE TABLE accent_webhook
+(
+    channel_id integer,
+    webhook_id integer,
+    token      text,
+
+    UNIQUE (channel_id)
+);
@@ -2,14 +2,16 @@ import re
 import logging
 import traceback
 
-from typing import Set
+from typing import Set, List, Tuple, Union, Pattern, Optional
 
 import aiohttp
 import discord
 
 from discord.ext import commands
+from discord.ext.commands.view import StringView
 
 from potato_bot.db import DB
+from potato_bot.utils import LRU
 
 from .context import Context
 from .constants import PREFIX
@@ -29,6 +31,9 @@ initial_extensions = (
 
 
 class Bot(commands.Bot):
+    # seconds parsed message is shared between listeners of same message
+    CONTEXT_MEMO_TTL = 10
+
     def __init__(self, **kwargs):
         super().__init__(
             command_prefix=commands.when_mentioned_or(PREFIX),
@@ -43,6 +48,7 @@ class Bot(commands.Bot):
                 emojis=True,
                 messages=True,
                 reactions=True,
+                webhooks=True,
             ),
             **kwargs,
         )
@@ -52,6 +58,14 @@ class Bot(commands.Bot):
 
         self.owner_ids: Set[int] = set()
 
+        # prefix set -> compiled matcher. prefix sets differ by bot user mention
+        # and DM empty prefix, so key covers both
+        self._prefix_matchers: LRU = LRU(64)
+        # (message id, author id, content hash) -> prefix, invoker and position
+        # after them. every listener of message reuses it to build own context
+        # without parsing again, dropped shortly after dispatch
+        self._parsed_messages: LRU = LRU(256)
+
         self.loop.run_until_complete(self.critical_setup())
         self.loop.create_task(self.setup())
 
@@ -62,7 +76,21 @@ class Bot(commands.Bot):
                 log.error(f"Error loading {extension}: {type(e).__name__} - {e}")
                 traceback.print_exc()
 
-    async def get_prefix(self, message: discord.Message):
+    def _prefix_matcher(self, prefixes: Tuple[str, ...]) -> Pattern[str]:
+        if (expr := self._prefix_matchers.get(prefixes)) is None:
+            expr = self._prefix_matchers[prefixes] = re.compile(
+                rf"^(?:{'|'.join(re.escape(p) for p in prefixes)})\s*", re.IGNORECASE
+            )
+
+        return expr
+
+    def invalidate_prefixes(self):
+        """Drop cached prefix and context state, call after changing command_prefix"""
+
+        self._prefix_matchers.clear()
+        self._parsed_messages.clear()
+
+    async def get_prefix(self, message: discord.Message) -> Union[str, List[str]]:
         standard = await super().get_prefix(message)
         if isinstance(standard, str):
             standard = [standard]
@@ -70,9 +98,7 @@ class Bot(commands.Bot):
         if message.guild is None:
             standard.append("")
 
-        expr = re.compile(
-            rf"^(?:{'|'.join(re.escape(p) for p in standard)})\s*", re.IGNORECASE
-        )
+        expr = self._prefix_matcher(tuple(standard))
 
         if (match := expr.match(message.content)) is not None:
             return match[0]
@@ -106,7 +132,52 @@ class Bot(commands.Bot):
         await self.db.close()
 
     async def get_context(self, message, *, cls=None):
-        return await super().get_context(message, cls=cls or Context)
+        if cls is not None and cls is not Context:
+            return await super().get_context(message, cls=cls)
+
+        key = (message.id, message.author.id, hash(message.content))
+        if (parsed := self._parsed_messages.get(key)) is not None:
+            return self._context_from_parsed(message, *parsed)
+
+        ctx = await super().get_context(message, cls=Context)
+
+        # context itself is not shared: invoking it consumes view and fills
+        # arguments and invocation state
+        self._parsed_messages[key] = (
+            ctx.prefix,
+            ctx.invoked_with,
+            ctx.view.index,
+            ctx.view.previous,
+        )
+        self.loop.call_later(
+            self.CONTEXT_MEMO_TTL, self._parsed_messages.pop, key, None
+        )
+
+        return ctx
+
+    def _context_from_parsed(
+        self,
+        message: discord.Message,
+        prefix: Optional[str],
+        invoked_with: Optional[str],
+        index: int,
+        previous: int,
+    ) -> Context:
+        view = StringView(message.content)
+        view.index = index
+        view.previous = previous
+
+        return Context(
+            prefix=prefix,
+            view=view,
+            bot=self,
+            message=message,
+            invoked_with=invoked_with,
+            # looked up every time, commands can be reloaded while memo lives
+            command=(
+                None if invoked_with is None else self.all_commands.get(invoked_with)
+            ),
+        )
 
     async def on_message(self, message: discord.Message):
         if message.author.bot:
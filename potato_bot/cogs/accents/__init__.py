@@ -1,23 +1,53 @@
+import os
+import sys
+import time
+import asyncio
+import logging
 import importlib
-
-from typing import Any, Dict, Optional, Sequence
+import contextlib
+import multiprocessing
+
+from typing import (
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Iterable,
+    Optional,
+    Sequence,
+    AsyncIterator,
+)
 from pathlib import Path
+from weakref import WeakValueDictionary
+from collections import Counter, OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 
 import discord
 
 from discord.ext import commands
 
+from potato_bot.db import DB
 from potato_bot.bot import Bot
 from potato_bot.cog import Cog
-from potato_bot.utils import LRU
+from potato_bot.utils import LRU, Timings
+from potato_bot.checks import is_owner
 from potato_bot.context import Context
+from potato_bot.constants import PREFIX
+
+from .dispatch import WebhookDispatcher
+from .settings import GuildSettings
+from .accents.accent import Accent, AccentChain, ReplacementContext
 
-from .accents.accent import Accent
+log = logging.getLogger(__name__)
 
 REQUIRED_PERMS = discord.Permissions(
     send_messages=True, manage_messages=True, manage_webhooks=True
 )
 
+WEBHOOK_NAME = "PotatoBot accent Webhook"
+
 
 class AccentConvertable(Accent, is_accent=False):
     @classmethod
@@ -29,46 +59,271 @@ class AccentConvertable(Accent, is_accent=False):
             raise commands.BadArgument(f'Accent "{argument}" does not exist')
 
 
+class AccentWithSeverity(AccentConvertable, is_accent=False):
+    """Accent name optionally followed by severity, for example owo:5"""
+
+    @classmethod
+    async def convert(cls, ctx: Context, argument: str) -> Tuple[Accent, int]:
+        name, separator, severity = argument.rpartition(":")
+        if not separator:
+            return await super().convert(ctx, argument), 1
+
+        if not severity.isdigit() or not 1 <= int(severity) <= Accents.MAX_SEVERITY:
+            raise commands.BadArgument(
+                f"Severity must be a number from 1 to {Accents.MAX_SEVERITY}"
+            )
+
+        return await super().convert(ctx, name), int(severity)
+
+
 class Accents(Cog):
     """Commands for managing accents"""
 
-    # guild_id -> user_id -> accents
-    # this has to be class variable because of hooks
-    accent_settings: Dict[int, Dict[int, Sequence[Accent]]] = {}
-
     MAX_ACCENTS_PER_USER = 10
+    MAX_SEVERITY = 10
+
+    # users selected by one query, stays below lowest sqlite variable limit
+    QUERY_USERS_CHUNK = 500
+
+    # guilds with loaded settings kept in memory, least recently used are dropped
+    GUILD_CACHE_SIZE = int(os.environ.get("ACCENT_GUILD_CACHE_SIZE", 1000))
+    # guilds with most accent users loaded in background after startup
+    WARMUP_GUILDS = int(os.environ.get("ACCENT_WARMUP_GUILDS", 20))
+
+    # guild_id -> user_id -> stack id
+    # this has to be class variable because of hooks.
+    # guilds are loaded on first use. users without accents are not stored,
+    # loaded guild without them means there is nothing to fetch
+    accent_settings: Dict[int, GuildSettings] = LRU(GUILD_CACHE_SIZE)
+
+    # every distinct accent stack is stored once, users refer to it by index.
+    # stacks are few and shared by many users, they are never removed
+    _stacks: List[AccentChain] = []
+    # chain key -> stack id
+    _stack_ids: Dict[Tuple[Tuple[str, int], ...], int] = {}
+
+    # where accents are rendered: inline (in event loop), thread or process
+    RENDER_EXECUTOR = os.environ.get("ACCENT_RENDER_EXECUTOR", "inline")
+    # shorter texts are rendered inline, executor overhead is not worth it
+    RENDER_INLINE_THRESHOLD = int(os.environ.get("ACCENT_RENDER_INLINE_THRESHOLD", 500))
+    # seconds, text is left untouched if rendering takes longer. checked between
+    # matches, so inline and thread renders stop shortly after it, except for a
+    # single regex match running over it
+    RENDER_TIMEOUT = float(os.environ.get("ACCENT_RENDER_TIMEOUT", 2))
+    # seconds, single replacement running longer is aborted. unset to disable
+    RULE_TIME_BUDGET = os.environ.get("ACCENT_RULE_TIME_BUDGET")
+    # how original message is replaced with accented one:
+    # delete_first: delete, then send. no duplicates, slowest
+    # send_first: send, then delete. original is kept if sending fails
+    # concurrent: both at once. fastest, message is lost if sending fails
+    REPLACE_ORDER = os.environ.get("ACCENT_REPLACE_ORDER", "delete_first")
+
+    # webhook messages allowed per channel in given number of seconds
+    WEBHOOK_RATE = int(os.environ.get("ACCENT_WEBHOOK_RATE", 5))
+    WEBHOOK_RATE_PER = float(os.environ.get("ACCENT_WEBHOOK_RATE_PER", 2))
+    # merge queued messages of the same author when channel is rate limited
+    WEBHOOK_COALESCE = os.environ.get("ACCENT_WEBHOOK_COALESCE", "1") == "1"
+
+    # channel webhooks kept in memory, all of them are also stored in database
+    WEBHOOK_CACHE_SIZE = int(os.environ.get("ACCENT_WEBHOOK_CACHE_SIZE", 500))
+    # rendered texts of deterministic accents kept in memory
+    RENDER_CACHE_SIZE = int(os.environ.get("ACCENT_RENDER_CACHE_SIZE", 256))
+
+    # (chain key, text) -> rendered text
+    _render_cache = LRU(RENDER_CACHE_SIZE)
+    _render_cache_hits = 0
+    _render_cache_misses = 0
+
+    # class variables because of hooks
+    _executor: Optional[Executor] = None
+    _db: Optional[DB] = None
+
+    # guild_id -> settings being fetched, shared by everyone waiting for them
+    _guild_loads: Dict[int, asyncio.Future] = {}
+
+    # stages of replacing user messages
+    _replace_timings = Timings()
+
+    @classmethod
+    def _intern_stack(cls, chain: AccentChain) -> int:
+        if (stack_id := cls._stack_ids.get(chain.key)) is None:
+            stack_id = len(cls._stacks)
+
+            cls._stacks.append(chain)
+            cls._stack_ids[chain.key] = stack_id
+
+        return stack_id
 
     def __init__(self, bot: Bot):
         super().__init__(bot)
 
         # channel_id -> Webhook
-        self._webhooks = LRU(50)
+        self._webhooks = LRU(self.WEBHOOK_CACHE_SIZE)
+        # channel_id -> webhook being fetched or created
+        self._webhook_loads: Dict[int, asyncio.Future] = {}
+        # (guild_id, user_id) -> lock held while user accents are read and written.
+        # locks only live while someone holds or waits for them
+        self._user_locks: WeakValueDictionary = WeakValueDictionary()
+        # channel_id -> send queue, least recently used first. not an LRU because
+        # busy dispatchers must not be evicted, see _evict_dispatchers
+        self._dispatchers: Dict[int, WebhookDispatcher] = OrderedDict()
+
+        Accents._db = bot.db
+
+        if self.RENDER_EXECUTOR == "thread":
+            Accents._executor = ThreadPoolExecutor()
+        elif self.RENDER_EXECUTOR == "process":
+            # bot process already runs threads (database, executors), forking it
+            # can copy locks held by them
+            Accents._executor = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_render_worker,
+                initargs=(self.RULE_TIME_BUDGET,),
+            )
+        elif self.RENDER_EXECUTOR != "inline":
+            raise ValueError(f"Unknown accent executor: {self.RENDER_EXECUTOR}")
+
+        if self.REPLACE_ORDER not in ("delete_first", "send_first", "concurrent"):
+            raise ValueError(f"Unknown accent replace order: {self.REPLACE_ORDER}")
+
+        if self.RULE_TIME_BUDGET is not None:
+            Accent.RULE_TIME_BUDGET = float(self.RULE_TIME_BUDGET)
+
+    def cog_unload(self):
+        super().cog_unload()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+            Accents._executor = None
 
     async def setup(self):
+        await self._load_webhooks()
+
+        # everything else is loaded on demand
         async with self.bot.db.cursor() as cur:
-            await cur.execute("SELECT * FROM user_accent")
-            accents = await cur.fetchall()
+            await cur.execute(
+                """
+                SELECT guild_id
+                FROM user_accent
+                GROUP BY guild_id
+                ORDER BY COUNT(DISTINCT user_id) DESC
+                LIMIT ?
+                """,
+                (min(self.WARMUP_GUILDS, self.GUILD_CACHE_SIZE),),
+            )
+            guilds = await cur.fetchall()
 
-        for row in accents:
-            accent = Accent.get_by_name(row["accent"])
+        for row in guilds:
+            if self.bot.get_guild(row["guild_id"]) is not None:
+                await self._load_guild(row["guild_id"])
 
-            guild_id = row["guild_id"]
-            user_id = row["user_id"]
+    async def _load_webhooks(self):
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT channel_id, webhook_id, token
+                FROM accent_webhook
+                ORDER BY rowid DESC
+                LIMIT ?
+                """,
+                (self.WEBHOOK_CACHE_SIZE,),
+            )
+            webhooks = await cur.fetchall()
 
-            if guild_id in self.accent_settings:
-                if user_id in self.accent_settings[guild_id]:
-                    self.accent_settings[guild_id][user_id].append(accent)
-                else:
-                    self.accent_settings[guild_id][user_id] = [accent]
-            else:
-                self.accent_settings[guild_id] = {user_id: [accent]}
+        # most recently stored go last, they are the last to be evicted
+        for row in reversed(webhooks):
+            self._webhooks[row["channel_id"]] = self._partial_webhook(
+                row["webhook_id"], row["token"]
+            )
+
+    @classmethod
+    async def _load_guild(cls, guild_id: int) -> GuildSettings:
+        if (load := cls._guild_loads.get(guild_id)) is None:
+            load = asyncio.ensure_future(cls._fetch_guild(guild_id))
+            load.add_done_callback(lambda _: cls._guild_loads.pop(guild_id, None))
+
+            cls._guild_loads[guild_id] = load
+
+        # one of waiters being cancelled should not affect others
+        return await asyncio.shield(load)
+
+    @classmethod
+    async def _fetch_guild(cls, guild_id: int) -> GuildSettings:
+        async with cls._db.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT user_id, accent, severity
+                FROM user_accent
+                WHERE guild_id = ?
+                ORDER BY rowid
+                """,
+                (guild_id,),
+            )
+            rows = await cur.fetchall()
+
+        # user_id -> accents, severities
+        users: Dict[int, Tuple[List[Accent], List[int]]] = {}
+        for row in rows:
+            try:
+                accent = Accent.get_by_name(row["accent"])
+            except KeyError:
+                # accent was renamed or removed, rows are left for a migration
+                log.warning(
+                    f"Skipping unknown accent {row['accent']} of {row['user_id']}"
+                    f" in {guild_id}"
+                )
+
+                continue
+
+            accents, severities = users.setdefault(row["user_id"], ([], []))
+
+            accents.append(accent)
+            severities.append(row["severity"])
+
+        settings = GuildSettings(
+            {
+                user_id: cls._intern_stack(AccentChain.get(accents, severities))
+                for user_id, (accents, severities) in users.items()
+            }
+        )
+        cls.accent_settings[guild_id] = settings
+
+        return settings
+
+    @classmethod
+    async def get_user_chain(cls, guild_id: int, user_id: int) -> AccentChain:
+        if (users := cls.accent_settings.get(guild_id)) is None:
+            users = await cls._load_guild(guild_id)
+        else:
+            cls.accent_settings.move_to_end(guild_id)
+
+        if (stack_id := users.get(user_id)) is None:
+            return AccentChain.get([])
+
+        return cls._stacks[stack_id]
 
     @classmethod
-    def get_user_accents(cls, guild_id: int, user_id: int) -> Sequence[Accent]:
-        if guild_id not in cls.accent_settings:
-            cls.accent_settings[guild_id] = {}
+    async def get_user_accents(cls, guild_id: int, user_id: int) -> Sequence[Accent]:
+        return (await cls.get_user_chain(guild_id, user_id)).accents
 
-        return cls.accent_settings[guild_id].get(user_id, [])
+    @classmethod
+    def _set_user_accents(
+        cls,
+        guild_id: int,
+        user_id: int,
+        accents: Sequence[Accent],
+        severities: Sequence[int],
+    ) -> None:
+        if (users := cls.accent_settings.get(guild_id)) is None:
+            # evicted, will be loaded from database next time
+            return
+
+        # chains are immutable, replacing chain invalidates it for this user
+        if accents:
+            users.set(user_id, cls._intern_stack(AccentChain.get(accents, severities)))
+        else:
+            users.remove(user_id)
 
     @commands.group(
         invoke_without_command=True, ignore_extra=False, aliases=["accents"]
@@ -78,9 +333,12 @@ class Accents(Cog):
 
         await ctx.send_help(ctx.command)
 
-    def _format_accent_list(self, accents: Sequence[Accent]) -> str:
+    def _format_accent_list(self, chain: AccentChain) -> str:
         body = ""
 
+        accents = chain.accents
+        severities = dict(zip(chain.accents, chain.severities))
+
         # I have no idea why this is not in stdlib, string has find method
         def sequence_find(seq: Sequence[Any], item: Any, default: int = -1) -> int:
             for i, j in enumerate(seq):
@@ -99,16 +357,21 @@ class Accents(Cog):
                 str(a).lower(),
             ),
         ):
-            enabled = accent in accents
-
-            body += f"{'+' if enabled else '-'} {accent}\n"
+            if (severity := severities.get(accent)) is None:
+                body += f"- {accent}\n"
+            elif severity == 1:
+                body += f"+ {accent}\n"
+            else:
+                body += f"+ {accent}:{severity}\n"
 
         return body
 
     async def _update_nick(self, ctx: Context):
         new_nick = ctx.me.name
-        for accent in self.get_user_accents(ctx.guild.id, ctx.me.id):
-            new_nick = accent.apply(new_nick, limit=32).strip()
+
+        chain = await self.get_user_chain(ctx.guild.id, ctx.me.id)
+        for accent, severity in zip(chain.accents, chain.severities):
+            new_nick = accent.apply(new_nick, severity=severity, limit=32).strip()
 
         await ctx.me.edit(nick=new_nick)
 
@@ -116,79 +379,264 @@ class Accents(Cog):
     async def _bot_accent(self, ctx: Context):
         """Manage bot accents, lists accents without arguments"""
 
-        accents = self.get_user_accents(ctx.guild.id, ctx.me.id)
-        formatted_list = self._format_accent_list(accents)
+        chain = await self.get_user_chain(ctx.guild.id, ctx.me.id)
+        formatted_list = self._format_accent_list(chain)
 
         await ctx.send(
             f"Bot accents (applied from top to bottom): ```diff\n{formatted_list}```"
         )
 
-    async def _add_accents(self, ctx: Context, user_id: int, accents: Sequence[Accent]):
-        current_accents = self.get_user_accents(ctx.guild.id, user_id)
+    @contextlib.asynccontextmanager
+    async def _lock_users(self, keys: Iterable[Tuple[int, int]]) -> AsyncIterator[None]:
+        """
+        Hold locks of given guild and user id pairs. Anything that reads user
+        accents, changes them and writes them back with set_accent_stacks must
+        do it under this lock, otherwise concurrent changes are lost.
+        """
+
+        # same order everywhere, two bulk changes cannot wait for each other
+        locks = []
+        for key in sorted(set(keys)):
+            if (lock := self._user_locks.get(key)) is None:
+                lock = self._user_locks[key] = asyncio.Lock()
 
-        if not (to_add := set(accents).difference(current_accents)):
-            await ctx.send("Nothing to add", exit=True)
+            locks.append(lock)
 
-        if len(current_accents) + len(to_add) > self.MAX_ACCENTS_PER_USER:
-            await ctx.send(
-                f"Cannot have more than **{self.MAX_ACCENTS_PER_USER}** enabled at once",
-                exit=True,
-            )
+        async with contextlib.AsyncExitStack() as stack:
+            for lock in locks:
+                await stack.enter_async_context(lock)
 
-        # sets are nice, but we must preserve order here
-        to_add = sorted(to_add, key=lambda x: accents.index(x))
+            yield
 
-        current_accents.extend(to_add)
+    async def set_accent_stacks(
+        self, stacks: Dict[Tuple[int, int], Sequence[Tuple[Accent, int]]]
+    ) -> int:
+        """
+        Set accents with severities of many users at once, keys are guild and
+        user ids. Caller must hold _lock_users of every user.
 
-        self.accent_settings[ctx.guild.id][user_id] = current_accents
+        Only difference with stored settings is written, all in one transaction.
+        Loaded settings are updated after commit without yielding to event
+        loop, so nobody sees half applied changes. Returns number of written rows.
+        """
 
-        async with ctx.db.cursor(commit=True) as cur:
+        by_guild: Dict[int, Dict[int, Sequence[Tuple[Accent, int]]]] = {}
+        for (guild_id, user_id), stack in stacks.items():
+            by_guild.setdefault(guild_id, {})[user_id] = stack
+
+        deletes = []
+        updates = []
+        inserts = []
+
+        known_accents = {str(accent).lower() for accent in Accent.all_accents()}
+
+        async with self.bot.db.cursor(commit=True) as cur:
+            for guild_id, users in by_guild.items():
+                user_ids = list(users)
+
+                stored: Dict[int, List[Any]] = {}
+                for i in range(0, len(user_ids), self.QUERY_USERS_CHUNK):
+                    chunk = user_ids[i : i + self.QUERY_USERS_CHUNK]
+
+                    await cur.execute(
+                        f"""
+                        SELECT user_id, accent, severity, forced
+                        FROM user_accent
+                        WHERE
+                            guild_id = ? AND
+                            user_id IN ({", ".join("?" * len(chunk))})
+                        ORDER BY rowid
+                        """,
+                        (guild_id, *chunk),
+                    )
+
+                    for row in await cur.fetchall():
+                        stored.setdefault(row["user_id"], []).append(row)
+
+                for user_id, stack in users.items():
+                    # rows of accents that no longer exist are left for a
+                    # migration, like in _fetch_guild
+                    old = [
+                        row
+                        for row in stored.get(user_id, [])
+                        if row["accent"].lower() in known_accents
+                    ]
+                    new = [(str(accent), severity) for accent, severity in stack]
+
+                    # order is defined by rowid, rows after first difference in
+                    # order have to be written again
+                    common = 0
+                    for row, (name, severity) in zip(old, new):
+                        if row["accent"] != name:
+                            break
+
+                        if row["severity"] != severity:
+                            updates.append((severity, guild_id, user_id, name))
+
+                        common += 1
+
+                    forced = {row["accent"]: row["forced"] for row in old}
+
+                    deletes.extend(
+                        (guild_id, user_id, row["accent"]) for row in old[common:]
+                    )
+                    inserts.extend(
+                        (guild_id, user_id, name, severity, forced.get(name, False))
+                        for name, severity in new[common:]
+                    )
+
+            # deletes go first, reinserted rows would violate uniqueness
+            await cur.executemany(
+                """
+                DELETE FROM user_accent
+                WHERE
+                    guild_id = ? AND
+                    user_id = ? AND
+                    accent = ?
+                """,
+                deletes,
+            )
+            await cur.executemany(
+                """
+                UPDATE user_accent
+                SET severity = ?
+                WHERE
+                    guild_id = ? AND
+                    user_id = ? AND
+                    accent = ?
+                """,
+                updates,
+            )
             await cur.executemany(
                 """
                 INSERT INTO user_accent (
                     guild_id,
                     user_id,
-                    accent
+                    accent,
+                    severity,
+                    forced
                 ) VALUES (
+                    ?,
+                    ?,
                     ?,
                     ?,
                     ?
                 )
                 """,
-                [(ctx.guild.id, user_id, str(accent)) for accent in to_add],
+                inserts,
             )
 
-    async def _remove_accents(
-        self, ctx: Context, user_id: int, accents: Sequence[Accent]
+        for (guild_id, user_id), stack in stacks.items():
+            self._set_user_accents(
+                guild_id,
+                user_id,
+                [accent for accent, _ in stack],
+                [severity for _, severity in stack],
+            )
+
+        return len(deletes) + len(updates) + len(inserts)
+
+    async def _add_accents(
+        self, ctx: Context, user_id: int, accents: Sequence[Tuple[Accent, int]]
     ):
-        current_accents = self.get_user_accents(ctx.guild.id, user_id)
+        """Add accents with severities, change severity of already enabled ones"""
+
+        async with self._lock_users([(ctx.guild.id, user_id)]):
+            chain = await self.get_user_chain(ctx.guild.id, user_id)
+            current = dict(zip(chain.accents, chain.severities))
+
+            # dicts preserve order, we must preserve it here
+            requested = dict(accents)
+            to_add = {a: s for a, s in requested.items() if a not in current}
+            to_update = {
+                a: s for a, s in requested.items() if a in current and current[a] != s
+            }
+
+            if not to_add and not to_update:
+                await ctx.send("Nothing to add", exit=True)
+
+            if len(current) + len(to_add) > self.MAX_ACCENTS_PER_USER:
+                await ctx.send(
+                    f"Cannot have more than **{self.MAX_ACCENTS_PER_USER}** enabled at once",
+                    exit=True,
+                )
 
-        if not accents:
-            accents = current_accents
+            # updated accents keep their position
+            current.update(to_update)
+            current.update(to_add)
 
-        if not (to_remove := set(current_accents).intersection(accents)):
-            await ctx.send("Nothing to remove", exit=True)
+            await self.set_accent_stacks({(ctx.guild.id, user_id): [*current.items()]})
 
-        self.accent_settings[ctx.guild.id][user_id] = [
-            a for a in current_accents if a not in to_remove
-        ]
+    async def _remove_accents(
+        self,
+        ctx: Context,
+        user_id: int,
+        accents: Sequence[Accent],
+        *,
+        keep_forced: bool = False,
+    ):
+        async with self._lock_users([(ctx.guild.id, user_id)]):
+            chain = await self.get_user_chain(ctx.guild.id, user_id)
+
+            if not accents:
+                accents = chain.accents
+
+            to_remove = set(chain.accents).intersection(accents)
+            if keep_forced and to_remove:
+                if forced := to_remove.intersection(
+                    await self._get_forced_accents(ctx.guild.id, user_id)
+                ):
+                    to_remove -= forced
+
+                    if not to_remove:
+                        await ctx.send("Forced accents cannot be removed", exit=True)
+
+            if not to_remove:
+                await ctx.send("Nothing to remove", exit=True)
+
+            await self.set_accent_stacks(
+                {
+                    (ctx.guild.id, user_id): [
+                        (accent, severity)
+                        for accent, severity in zip(chain.accents, chain.severities)
+                        if accent not in to_remove
+                    ]
+                }
+            )
 
-        async with ctx.db.cursor(commit=True) as cur:
-            await cur.executemany(
+    async def _get_forced_accents(self, guild_id: int, user_id: int) -> Set[Accent]:
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(
                 """
-                DELETE FROM user_accent
+                SELECT accent
+                FROM user_accent
                 WHERE
                     guild_id = ? AND
                     user_id = ? AND
-                    accent = ?
+                    forced
                 """,
-                [(ctx.guild.id, user_id, str(accent)) for accent in to_remove],
+                (guild_id, user_id),
             )
+            rows = await cur.fetchall()
+
+        accents = set()
+        for row in rows:
+            try:
+                accents.add(Accent.get_by_name(row["accent"]))
+            except KeyError:
+                # unknown accent cannot be applied, so nothing to protect
+                continue
+
+        return accents
 
     @_bot_accent.command(name="add", aliases=["enable", "on"])
     @commands.has_permissions(manage_guild=True)
-    async def _bot_accent_add(self, ctx: Context, *accents: AccentConvertable):
-        """Add bot accents"""
+    async def _bot_accent_add(self, ctx: Context, *accents: AccentWithSeverity):
+        """
+        Add bot accents
+
+        Severity can be set after colon: owo:5
+        """
 
         if not accents:
             return await ctx.send("No accents provided")
@@ -215,10 +663,160 @@ class Accents(Cog):
         await ctx.send("Removed bot accents")
 
     @accent.command(name="use")
-    async def accent_use(self, ctx: Context, accent: AccentConvertable, *, text: str):
-        """Apply specified accent to text"""
+    async def accent_use(self, ctx: Context, accent: AccentWithSeverity, *, text: str):
+        """Apply specified accent to text, severity can be set after colon: owo:5"""
+
+        await ctx.send(text, accents=AccentChain.get([accent[0]], [accent[1]]))
+
+    @accent.group(name="bulk", invoke_without_command=True, ignore_extra=False)
+    @is_owner()
+    async def accent_bulk(self, ctx: Context):
+        """Change accents of every member of guild at once"""
+
+        await ctx.send_help(ctx.command)
+
+    @accent_bulk.command(name="add")
+    @is_owner()
+    async def accent_bulk_add(
+        self, ctx: Context, guild: discord.Guild, *accents: AccentWithSeverity
+    ):
+        """
+        Add accents to every member of guild
+
+        Severity can be set after colon: owo:5
+        """
+
+        if not accents:
+            return await ctx.send("No accents provided")
+
+        members = [m for m in guild.members if not m.bot]
+
+        stacks = {}
+        skipped = 0
+        async with self._lock_users((guild.id, m.id) for m in members):
+            for member in members:
+                chain = await self.get_user_chain(guild.id, member.id)
+                current = dict(zip(chain.accents, chain.severities))
+                stack = {**current, **dict(accents)}
+
+                if len(stack) > self.MAX_ACCENTS_PER_USER:
+                    skipped += 1
+
+                    continue
 
-        await ctx.send(text, accents=[accent])
+                if stack != current:
+                    stacks[(guild.id, member.id)] = [*stack.items()]
+
+            written = await self.set_accent_stacks(stacks)
+
+        await ctx.send(
+            f"Changed accents of **{len(stacks)}** members ({written} rows),"
+            f" **{skipped}** skipped because of accent limit",
+            accents=[],
+        )
+
+    @accent_bulk.command(name="remove")
+    @is_owner()
+    async def accent_bulk_remove(
+        self, ctx: Context, guild: discord.Guild, *accents: AccentConvertable
+    ):
+        """
+        Remove accents from every member of guild
+
+        Forced accents are removed too
+        """
+
+        if not accents:
+            return await ctx.send("No accents provided")
+
+        members = [m for m in guild.members if not m.bot]
+
+        stacks = {}
+        async with self._lock_users((guild.id, m.id) for m in members):
+            for member in members:
+                chain = await self.get_user_chain(guild.id, member.id)
+                if not set(chain.accents).intersection(accents):
+                    continue
+
+                stacks[(guild.id, member.id)] = [
+                    (accent, severity)
+                    for accent, severity in zip(chain.accents, chain.severities)
+                    if accent not in accents
+                ]
+
+            written = await self.set_accent_stacks(stacks)
+
+        await ctx.send(
+            f"Changed accents of **{len(stacks)}** members ({written} rows)",
+            accents=[],
+        )
+
+    @accent.command(name="stats")
+    @is_owner()
+    async def accent_stats(self, ctx: Context):
+        """Show accent engine counters"""
+
+        accents = sorted(Accent.all_accents(), key=lambda a: str(a).lower())
+        name_width = max(len(str(a)) for a in accents)
+
+        body = f"{'accent':<{name_width}} | executed | skipped | aborted\n"
+        for accent in accents:
+            body += (
+                f"{str(accent):<{name_width}} | {accent.replacements_executed:>8} |"
+                f" {accent.replacements_skipped:>7} |"
+                f" {accent.replacements_aborted:>7}\n"
+            )
+
+        cache = (
+            f"{len(self._render_cache)}/{self._render_cache.maxsize} entries,"
+            f" {self._render_cache_hits} hits, {self._render_cache_misses} misses"
+        )
+
+        dispatchers = self._dispatchers.values()
+        queues = (
+            f"{len(dispatchers)} channels,"
+            f" {sum(len(d.queue) for d in dispatchers)} queued,"
+            f" max depth {max((d.max_depth for d in dispatchers), default=0)},"
+            f" {sum(d.sent for d in dispatchers)} sent,"
+            f" {sum(d.coalesced for d in dispatchers)} merged"
+        )
+
+        await ctx.send(
+            f"Replacements:```\n{body}```Render cache: {cache}\n"
+            f"Message replacement:```\n{self._replace_timings.format()}```"
+            f"Webhook queues: {queues}",
+            accents=[],
+        )
+
+    @accent.command(name="memory")
+    @is_owner()
+    async def accent_memory(self, ctx: Context):
+        """Show memory used by loaded accent settings"""
+
+        guilds = self.accent_settings.values()
+
+        size = sys.getsizeof(self.accent_settings) + sum(map(sys.getsizeof, guilds))
+        stack_users = Counter(
+            stack_id for users in guilds for _, stack_id in users.items()
+        )
+
+        body = (
+            f"guilds: {len(guilds)}/{self.GUILD_CACHE_SIZE}\n"
+            f"users: {sum(stack_users.values())}\n"
+            f"stacks: {len(self._stacks)}\n"
+            f"size: {size} bytes\n"
+        )
+
+        if stack_users:
+            body += "\nmost used stacks:\n"
+            for stack_id, count in stack_users.most_common(5):
+                stack = " ".join(
+                    f"{name}:{severity}"
+                    for name, severity in self._stacks[stack_id].key
+                )
+                body += f"{count:>6} {stack}\n"
+
+        await ctx.send(f"Accent settings:```\n{body}```", accents=[])
 
     @accent.group(
         name="me",
@@ -229,8 +827,8 @@ class Accents(Cog):
     async def my_accents(self, ctx: Context):
         """Manage your accents, lists accents without arguments"""
 
-        accents = self.get_user_accents(ctx.guild.id, ctx.author.id)
-        formatted_list = self._format_accent_list(accents)
+        chain = await self.get_user_chain(ctx.guild.id, ctx.author.id)
+        formatted_list = self._format_accent_list(chain)
 
         await ctx.send(
             f"Your accents (applied from top to bottom): ```diff\n{formatted_list}```"
@@ -239,14 +837,22 @@ class Accents(Cog):
     @my_accents.command(name="add", aliases=["enable", "on"])
     @commands.guild_only()
     @commands.bot_has_permissions(manage_messages=True, manage_webhooks=True)
-    async def add_my_accent(self, ctx, *accents: AccentConvertable):
-        """Add personal accents"""
+    async def add_my_accent(self, ctx, *accents: AccentWithSeverity):
+        """
+        Add personal accents
+
+        Severity can be set after colon: owo:5
+        """
 
         if not accents:
             return await ctx.send("No accents provided")
 
         await self._add_accents(ctx, ctx.author.id, accents)
 
+        # first accented message in channel should not wait for webhook
+        if ctx.channel.id not in self._webhooks:
+            self.bot.loop.create_task(self._prefetch_webhook(ctx.channel))
+
         await ctx.send("Added personal accents")
 
     @my_accents.command(name="remove", aliases=["disable", "off"])
@@ -258,7 +864,7 @@ class Accents(Cog):
         Removes all if used without arguments
         """
 
-        await self._remove_accents(ctx, ctx.author.id, accents)
+        await self._remove_accents(ctx, ctx.author.id, accents, keep_forced=True)
 
         await ctx.send("Removed personal accents")
 
@@ -268,61 +874,175 @@ class Accents(Cog):
         """OwO what's this"""
 
         owo = await AccentConvertable.convert(ctx, "owo")
-        my_accents = self.get_user_accents(ctx.guild.id, ctx.me.id)
+        my_accents = await self.get_user_accents(ctx.guild.id, ctx.me.id)
         if owo in my_accents:
             await self._remove_accents(ctx, ctx.me.id, [owo])
         else:
-            await self._add_accents(ctx, ctx.me.id, [owo])
+            await self._add_accents(ctx, ctx.me.id, [(owo, 1)])
 
         await self._update_nick(ctx)
 
         await ctx.send("owo toggled")
 
     @staticmethod
-    def _apply_accents(content: str, accents: Sequence[Accent]) -> Optional[str]:
-        for accent in accents:
-            content = accent.apply(content)
+    def _apply_accents(
+        content: str,
+        accents: AccentChain,
+        seed: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """Returns None if rendering took longer than timeout"""
+
+        context = ReplacementContext(seed=seed)
+        if timeout is not None:
+            context.render_deadline = time.perf_counter() + timeout
+
+        content = accents.apply(content, context=context)
+
+        if context.timed_out:
+            log.warning(
+                f"Rendering {accents} took longer than {timeout}s,"
+                f" {len(content)} characters"
+            )
+
+            return None
+
+        if context.exhausted:
+            log.debug(
+                f"Length limit reached rendering {accents},"
+                f" {context.accented:.0%} of matches replaced,"
+                f" {context.refused} skipped, {context.limited} rules not run"
+            )
 
         return content
 
-    @Context.hook()
+    @classmethod
+    async def _render(
+        cls, content: str, accents: AccentChain, seed: Optional[int] = None
+    ) -> str:
+        """
+        Apply accents, offloading long texts to executor if it is enabled.
+        Result is reproducible if seed is passed, message id is a good one.
+
+        Results of deterministic accents are cached. Cache is only accessed from
+        event loop, so executors do not need to synchronize anything.
+        """
+
+        key = (accents.key, content)
+        if cacheable := bool(accents) and accents.deterministic:
+            if (rendered := cls._render_cache.get(key)) is not None:
+                cls._render_cache.move_to_end(key)
+                cls._render_cache_hits += 1
+
+                return rendered
+
+            cls._render_cache_misses += 1
+
+        if (rendered := await cls._render_uncached(content, accents, seed)) is None:
+            return content
+
+        if cacheable:
+            cls._render_cache[key] = rendered
+
+        return rendered
+
+    @classmethod
+    async def _render_uncached(
+        cls, content: str, accents: AccentChain, seed: Optional[int]
+    ) -> Optional[str]:
+        """Returns None if rendering timed out"""
+
+        if (
+            cls._executor is None
+            or not accents
+            or len(content) < cls.RENDER_INLINE_THRESHOLD
+        ):
+            return cls._apply_accents(content, accents, seed, cls.RENDER_TIMEOUT)
+
+        loop = asyncio.get_running_loop()
+
+        if isinstance(cls._executor, ProcessPoolExecutor):
+            # accents cannot be pickled, worker looks them up by name
+            future = loop.run_in_executor(
+                cls._executor,
+                _render_by_key,
+                content,
+                accents.key,
+                seed,
+                cls.RENDER_TIMEOUT,
+            )
+        else:
+            future = loop.run_in_executor(
+                cls._executor,
+                cls._apply_accents,
+                content,
+                accents,
+                seed,
+                cls.RENDER_TIMEOUT,
+            )
+
+        # render stops by itself, this also covers time spent waiting in queue
+        try:
+            return await asyncio.wait_for(future, cls.RENDER_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning(
+                f"Rendering {accents} took longer than {cls.RENDER_TIMEOUT}s,"
+                f" {len(content)} characters"
+            )
+
+            return None
+
+    # transform hook: content rendered once, hooks below see it as final
+    @Context.hook(transform=True)
     async def on_send(
         original,
         ctx: Context,
         content: Any = None,
         *,
-        accents: Optional[Sequence[Accent]] = None,
+        accents: Optional[Union[Sequence[Accent], AccentChain]] = None,
         **kwargs: Any,
     ) -> discord.Message:
         if content is not None:
             if accents is None:
                 if ctx.guild is not None:
-                    accents = Accents.get_user_accents(ctx.guild.id, ctx.me.id)
+                    chain = await Accents.get_user_chain(ctx.guild.id, ctx.me.id)
                 else:
-                    accents = []
+                    chain = AccentChain.get([])
+            elif isinstance(accents, AccentChain):
+                chain = accents
+            else:
+                chain = AccentChain.get(accents)
+
+            content = await Accents._render(str(content), chain)
 
-            content = Accents._apply_accents(str(content), accents)
+        kwargs["final"] = True
 
         return await original(ctx, content, **kwargs)
 
-    @Context.hook()
+    @Context.hook(transform=True)
     async def on_edit(
         original,
         ctx: Context,
         message: discord.Message,
         *,
-        accents: Optional[Sequence[Accent]] = None,
+        accents: Optional[Union[Sequence[Accent], AccentChain]] = None,
         content: Optional[str] = None,
         **kwargs: Any,
     ):
         if content is not None:
             if accents is None:
                 if ctx.guild is not None:
-                    accents = Accents.get_user_accents(ctx.guild.id, ctx.me.id)
+                    chain = await Accents.get_user_chain(ctx.guild.id, ctx.me.id)
                 else:
-                    accents = []
+                    chain = AccentChain.get([])
+            elif isinstance(accents, AccentChain):
+                chain = accents
+            else:
+                chain = AccentChain.get(accents)
+
+            content = await Accents._render(str(content), chain, message.id)
 
-            content = Accents._apply_accents(str(content), accents)
+        kwargs["final"] = True
 
         return await original(ctx, message, content=content, **kwargs)
 
@@ -344,7 +1064,9 @@ class Accents(Cog):
         if message.reference is not None:
             return
 
-        if not (accents := self.get_user_accents(message.guild.id, message.author.id)):
+        if not (
+            accents := await self.get_user_chain(message.guild.id, message.author.id)
+        ):
             return
 
         if not message.channel.permissions_for(message.guild.me).is_superset(
@@ -352,45 +1074,206 @@ class Accents(Cog):
         ):
             return
 
-        if (ctx := await self.bot.get_context(message)).valid:
+        # building context is expensive, only do it early for possible commands
+        ctx = None
+        if self._maybe_command(message.content):
+            with self._replace_timings("context"):
+                ctx = await self.bot.get_context(message)
+
+            if ctx.valid:
+                return
+
+        # fetching webhook takes a few requests, do it while message is rendered.
+        # commands are never replaced, they should not create webhooks
+        if message.channel.id not in self._webhooks:
+            self.bot.loop.create_task(self._prefetch_webhook(message.channel))
+
+        with self._replace_timings("render"):
+            content = await self._render(message.content, accents, message.id)
+
+        if content == message.content:
             return
 
-        if (
-            content := self._apply_accents(message.content, accents)
-        ) == message.content:
+        if ctx is None:
+            with self._replace_timings("context"):
+                ctx = await self.bot.get_context(message)
+
+        with self._replace_timings("replace"):
+            if self.REPLACE_ORDER == "delete_first":
+                if await self._delete_original(message):
+                    await self._send_replacement(ctx, content, message)
+
+                return
+
+            if self.REPLACE_ORDER == "send_first":
+                sent = await self._send_replacement(ctx, content, message)
+                deleted = await self._delete_original(message)
+            else:
+                sent, deleted = await asyncio.gather(
+                    self._send_replacement(ctx, content, message),
+                    self._delete_original(message),
+                )
+
+            # original was deleted by someone else, copy should go too. merged
+            # copies contain other messages and are left alone
+            if not deleted and sent is not None:
+                await sent.delete()
+
+    async def _delete_original(self, message: discord.Message) -> bool:
+        """Returns False if message was already deleted"""
+
+        with self._replace_timings("delete"):
+            try:
+                await message.delete()
+            except discord.NotFound:
+                return False
+
+        return True
+
+    async def _send_replacement(
+        self, ctx: Context, content: str, original: discord.Message
+    ) -> Optional[discord.WebhookMessage]:
+        """Returns None if message was merged with other messages"""
+
+        async def send(content: str) -> discord.WebhookMessage:
+            try:
+                return await self._send_new_message(ctx, content, original)
+            except discord.NotFound:
+                # cached webhook was deleted
+                await self._forget_webhook(original.channel.id)
+
+                return await self._send_new_message(ctx, content, original)
+
+        if (dispatcher := self._dispatchers.get(original.channel.id)) is None:
+            dispatcher = WebhookDispatcher(
+                self.WEBHOOK_RATE, self.WEBHOOK_RATE_PER, self.WEBHOOK_COALESCE
+            )
+            self._dispatchers[original.channel.id] = dispatcher
+
+            self._evict_dispatchers()
+        else:
+            self._dispatchers.move_to_end(original.channel.id)
+
+        with self._replace_timings("send"):
+            return await dispatcher.submit(
+                original.author.id,
+                content,
+                # embeds cannot be merged
+                mergeable=not original.embeds,
+                send=send,
+            )
+
+    def _evict_dispatchers(self) -> None:
+        """
+        Drop least recently used idle dispatchers until cache fits. Dispatcher
+        with queued or sending messages is kept: replacing it would start second
+        worker for the same channel, breaking order and rate limit.
+        """
+
+        excess = len(self._dispatchers) - self.WEBHOOK_CACHE_SIZE
+        if excess <= 0:
             return
 
-        await message.delete()
-        try:
-            await self._send_new_message(ctx, content, message)
-        except discord.NotFound:
-            # cached webhook is missing, should invalidate cache
-            del self._webhooks[message.channel.id]
+        idle = []
+        for channel_id, dispatcher in self._dispatchers.items():
+            if dispatcher.idle:
+                idle.append(channel_id)
+
+                if len(idle) == excess:
+                    break
 
-            await self._send_new_message(ctx, content, message)
+        for channel_id in idle:
+            del self._dispatchers[channel_id]
+
+    def _maybe_command(self, content: str) -> bool:
+        """Cheap version of prefix check, can give false positives"""
+
+        # mention prefix
+        if content.startswith("<@"):
+            return True
+
+        return content[: len(PREFIX)].lower() == PREFIX.lower()
+
+    def _partial_webhook(self, webhook_id: int, token: str) -> discord.Webhook:
+        return discord.Webhook.partial(
+            webhook_id, token, adapter=discord.AsyncWebhookAdapter(self.bot.session)
+        )
 
     async def _get_cached_webhook(
         self, channel: discord.TextChannel
     ) -> discord.Webhook:
-        if (wh := self._webhooks.get(channel.id)) is None:
-            wh_name = "PotatoBot accent Webhook"
+        if (wh := self._webhooks.get(channel.id)) is not None:
+            self._webhooks.move_to_end(channel.id)
+
+            return wh
+
+        if (load := self._webhook_loads.get(channel.id)) is None:
+            load = asyncio.ensure_future(self._fetch_webhook(channel))
+            load.add_done_callback(lambda _: self._webhook_loads.pop(channel.id, None))
+
+            self._webhook_loads[channel.id] = load
+
+        # one of waiters being cancelled should not affect others
+        return await asyncio.shield(load)
+
+    async def _fetch_webhook(self, channel: discord.TextChannel) -> discord.Webhook:
+        async with self.bot.db.cursor() as cur:
+            await cur.execute(
+                "SELECT webhook_id, token FROM accent_webhook WHERE channel_id = ?",
+                (channel.id,),
+            )
+            row = await cur.fetchone()
+
+        if row is not None:
+            wh = self._partial_webhook(row["webhook_id"], row["token"])
+        else:
             for wh in await channel.webhooks():
-                if wh.name == wh_name:
+                if wh.name == WEBHOOK_NAME and wh.token is not None:
                     break
             else:
-                wh = await channel.create_webhook(name=wh_name)
+                wh = await channel.create_webhook(name=WEBHOOK_NAME)
+
+            async with self.bot.db.cursor(commit=True) as cur:
+                await cur.execute(
+                    """
+                    INSERT OR REPLACE INTO accent_webhook (
+                        channel_id,
+                        webhook_id,
+                        token
+                    ) VALUES (
+                        ?,
+                        ?,
+                        ?
+                    )
+                    """,
+                    (channel.id, wh.id, wh.token),
+                )
 
-            self._webhooks[channel.id] = wh
+        self._webhooks[channel.id] = wh
 
         return wh
 
+    async def _prefetch_webhook(self, channel: discord.TextChannel):
+        try:
+            await self._get_cached_webhook(channel)
+        except discord.HTTPException as e:
+            log.debug(f"Unable to prefetch webhook for {channel.id}: {e}")
+
+    async def _forget_webhook(self, channel_id: int):
+        self._webhooks.pop(channel_id, None)
+
+        async with self.bot.db.cursor(commit=True) as cur:
+            await cur.execute(
+                "DELETE FROM accent_webhook WHERE channel_id = ?", (channel_id,)
+            )
+
     async def _send_new_message(
         self,
         ctx: Context,
         content: str,
         original: discord.Message,
-    ) -> None:
-        await ctx.send(
+    ) -> discord.WebhookMessage:
+        return await ctx.send(
             content,
             allowed_mentions=discord.AllowedMentions(
                 everyone=original.author.guild_permissions.mention_everyone,
@@ -404,18 +1287,54 @@ class Accents(Cog):
             username=original.author.display_name,
             avatar_url=original.author.avatar_url,
             embeds=original.embeds,
+            # sent message is needed to clean up after failed delete
+            wait=True,
         )
 
     @Cog.listener()
     async def on_message(self, message: discord.Message):
         await self._replace_message(message)
 
+    @Cog.listener()
+    async def on_webhooks_update(self, channel: discord.abc.GuildChannel):
+        if (wh := self._webhooks.get(channel.id)) is None:
+            return
+
+        # event is also sent when our own webhook is created, so check if
+        # cached one is still there instead of dropping it right away
+        try:
+            webhooks = await channel.webhooks()
+        except discord.Forbidden:
+            webhooks = []
+        except discord.HTTPException:
+            return
+
+        if all(webhook.id != wh.id for webhook in webhooks):
+            await self._forget_webhook(channel.id)
+
     # needed in case people use command and edit their message
     @Cog.listener()
     async def on_message_edit(self, old: discord.Message, new: discord.Message):
         await self._replace_message(new)
 
 
+def _render_by_key(
+    content: str,
+    key: Sequence[Tuple[str, int]],
+    seed: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    return Accents._apply_accents(content, AccentChain.from_key(key), seed, timeout)
+
+
+def _init_render_worker(rule_time_budget: Optional[str]):
+    # workers start from scratch, nothing set up by cog is inherited
+    load_accents()
+
+    if rule_time_budget is not None:
+        Accent.RULE_TIME_BUDGET = float(rule_time_budget)
+
+
 def load_accents():
     for child in (Path(__file__).parent / "accents").iterdir():
         if child.suffix != ".py":
@@ -2,13 +2,21 @@ import sys
 import importlib
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
-from .accent import Accent
+from .accent import Accent, AccentChain
 
 USAGE = f"""python -m {__package__} <severity> [accent...]
 
 Starts interactive session if used without arguments.
-Lists accents if no accents provided."""
+Lists accents if no accents provided.
+Renders every line separately if input is not a terminal.
+
+Benchmarks: python -m {__package__}.bench --help
+Pattern audit: python -m {__package__}.audit --help"""
+
+# smaller batches are faster to render than to send to other processes
+BATCH_POOL_THRESHOLD = 1000
 
 
 def load_accents():
@@ -40,29 +48,41 @@ def main():
 
     severity = int(sys.argv[1])
 
-    accents = set()
+    accents = []
     for arg in sys.argv[2:]:
         try:
             accent = Accent.get_by_name(arg.lower())
         except KeyError:
             print(f"Warning: Skipping unknown accent: {arg}")
         else:
-            accents.add(accent)
+            if accent not in accents:
+                accents.append(accent)
 
     if not accents:
         print("No accents matched, exiting")
         sys.exit(1)
 
+    chain = AccentChain.get(accents, [severity] * len(accents))
+
+    if not sys.stdin.isatty():
+        texts = sys.stdin.read().splitlines()
+
+        if len(texts) < BATCH_POOL_THRESHOLD:
+            results = chain.apply_many(texts)
+        else:
+            with ProcessPoolExecutor(initializer=load_accents) as executor:
+                results = chain.apply_many(texts, executor=executor)
+
+        print("\n".join(results))
+        sys.exit(0)
+
     while True:
         try:
             text = input("> ")
         except (EOFError, KeyboardInterrupt):
             sys.exit(0)
 
-        for accent in accents:
-            text = accent.apply(text, severity=severity)
-
-        print(text)
+        print(chain.apply(text))
 
 
 if __name__ == "__main__":
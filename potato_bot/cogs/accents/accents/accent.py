@@ -1,24 +1,107 @@
 from __future__ import annotations
 
 import re
+import time
+import bisect
 import random
+import weakref
 import itertools
 
-from typing import Any, Dict, Union, Callable, Optional, Sequence
+from typing import (
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    FrozenSet,
+)
+from concurrent.futures import Executor
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # python < 3.11
+    import sre_parse
+    import sre_constants
 
 
 class ReplacementContext:
     __slots__ = (
         "position",
         "data",
+        "limit",
+        "refused",
+        "limited",
+        "deadline",
+        "render_deadline",
+        "timed_out",
+        "rng",
     )
 
-    def __init__(self, position: int = 0, data: Any = None):
+    def __init__(
+        self,
+        position: int = 0,
+        data: Any = None,
+        limit: int = 2000,
+        seed: Optional[Hashable] = None,
+    ):
         self.position = position
         self.data = data
 
+        # source of randomness for callbacks. same seed, text and accents always
+        # give the same result. without seed global random module is used
+        self.rng: random.Random = random if seed is None else random.Random(seed)
+
+        # maximum length of text, shared by all replacements of all accents
+        self.limit = limit
+        # matches not replaced because text would grow past limit
+        self.refused = 0
+        # replacements not run at all: nothing they produce fits into limit
+        self.limited = 0
+
+        # perf_counter value after which current replacement is aborted
+        self.deadline: Optional[float] = None
+        # perf_counter value after which the whole rendering stops. checked
+        # between matches, a single slow match can still run over
+        self.render_deadline: Optional[float] = None
+        # rendering stopped because of render_deadline, text is incomplete
+        self.timed_out = False
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether limit was reached"""
+
+        return self.refused > 0 or self.limited > 0
+
+    @property
+    def accented(self) -> float:
+        """
+        Share of matches that were replaced, the rest was left because of limit.
+        Position counts replacements made, so context has to start at 0.
+        Matches of replacements that were not run are not known and not counted.
+        """
+
+        if (total := self.position + self.refused) == 0:
+            return 1.0
+
+        return self.position / total
+
     def __repr__(self) -> str:
-        return f"<{type(self).__name__} position={self.position} data={self.data}>"
+        return (
+            f"<{type(self).__name__} position={self.position} data={self.data}"
+            f" limit={self.limit} refused={self.refused} limited={self.limited}>"
+        )
+
+
+class ReplacementTimeout(Exception):
+    """Replacement took longer than Accent.RULE_TIME_BUDGET"""
 
 
 class Match:
@@ -37,6 +120,10 @@ class Match:
     def original(self):
         return self.match[0]
 
+    @property
+    def rng(self) -> random.Random:
+        return self.context.rng
+
     def __repr__(self) -> str:
         return f"<{type(self).__name__} match={self.match} severity={self.severity} context={self.context}>"
 
@@ -59,18 +146,401 @@ class Severity:
     pass
 
 
-class Replacement:
+# ranges wider than this are not worth listing character by character
+_MAX_RANGE_WIDTH = 256
+
+
+def _charset_chars(items: Iterable[Tuple[Any, Any]]) -> Optional[Set[str]]:
+    chars = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE:
+            low, high = av
+            if high - low > _MAX_RANGE_WIDTH:
+                return None
+
+            chars.update(chr(c) for c in range(low, high + 1))
+        else:
+            # categories, negation
+            return None
+
+    return chars
+
+
+def _sequence_first_chars(
+    items: Iterable[Tuple[Any, Any]],
+) -> Tuple[Optional[Set[str]], bool]:
+    """
+    Returns characters sequence can start with and whether it can match empty string.
+    None means any character.
+    """
+
+    chars = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av))
+
+            return chars, False
+
+        if op is sre_constants.IN:
+            if (item_chars := _charset_chars(av)) is None:
+                return None, False
+
+            return chars | item_chars, False
+
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            # zero width, ignoring them only makes result less precise
+            continue
+
+        if op is sre_constants.SUBPATTERN:
+            item_chars, nullable = _sequence_first_chars(av[-1])
+        elif op is sre_constants.BRANCH:
+            item_chars = set()
+            nullable = False
+            for branch in av[1]:
+                branch_chars, branch_nullable = _sequence_first_chars(branch)
+                if branch_chars is None:
+                    return None, False
+
+                item_chars |= branch_chars
+                nullable = nullable or branch_nullable
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            min_repeats, _, item = av
+            item_chars, nullable = _sequence_first_chars(item)
+            nullable = nullable or min_repeats == 0
+        else:
+            # anything else is too complex to bother
+            return None, False
+
+        if item_chars is None:
+            return None, False
+
+        chars |= item_chars
+
+        if not nullable:
+            return chars, False
+
+    return chars, True
+
+
+def _first_chars(pattern: re.Pattern) -> Optional[FrozenSet[str]]:
+    """
+    Returns set of characters any match of pattern starts with, case is not
+    normalized. None is returned if this cannot be determined or pattern is
+    able to match empty string.
+    """
+
+    chars, nullable = _sequence_first_chars(
+        sre_parse.parse(pattern.pattern, pattern.flags)
+    )
+    if chars is None or nullable:
+        return None
+
+    return frozenset(chars)
+
+
+def _has_backreferences(pattern: re.Pattern) -> bool:
+    """Whether pattern refers to its own groups, these break if groups are renumbered"""
+
+    def walk(items: Any) -> bool:
+        for item in items:
+            if isinstance(item, (list, tuple, sre_parse.SubPattern)):
+                if walk(item):
+                    return True
+            elif item in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+                return True
+
+        return False
+
+    return walk(sre_parse.parse(pattern.pattern, pattern.flags))
+
+
+def _leading_boundary(pattern: re.Pattern) -> bool:
+    """
+    Whether pattern string starts with word boundary that applies to every
+    match. Boundary of the first branch of top level alternation does not.
+    """
+
+    if not pattern.pattern.startswith(r"\b"):
+        return False
+
+    items = sre_parse.parse(pattern.pattern, pattern.flags)
+
+    return items[0] == (sre_constants.AT, sre_constants.AT_BOUNDARY) and all(
+        op is not sre_constants.BRANCH for op, _ in items
+    )
+
+
+# literal prefixes are expanded from character sets only while there are few of them
+_MAX_REQUIRED_LITERALS = 32
+
+
+def _required_literals(
+    pattern: re.Pattern, first_chars: Optional[FrozenSet[str]]
+) -> Optional[FrozenSet[str]]:
+    """
+    Returns strings at least one of which must be present in text for pattern
+    to match, lowercase if pattern ignores case. None means pattern cannot be
+    filtered this way.
+    """
+
+    prefixes = {""}
+    for op, av in sre_parse.parse(pattern.pattern, pattern.flags):
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if prefixes == {""}:
+                # leading zero width items
+                continue
+
+            break
+
+        if op is sre_constants.LITERAL:
+            chars = {chr(av)}
+        elif op is sre_constants.IN:
+            chars = _charset_chars(av)
+        else:
+            break
+
+        if chars is None or len(prefixes) * len(chars) > _MAX_REQUIRED_LITERALS:
+            break
+
+        prefixes = {p + c for p in prefixes for c in chars}
+
+    if prefixes == {""}:
+        if first_chars is None:
+            return None
+
+        prefixes = set(first_chars)
+
+    if pattern.flags & re.IGNORECASE:
+        # only ascii is lowercased reliably, see _lower
+        if not all(p.isascii() for p in prefixes):
+            return None
+
+        prefixes = {p.lower() for p in prefixes}
+
+    return frozenset(prefixes)
+
+
+# finite patterns are expanded into strings they match while there are few of them
+_MAX_EXPANSIONS = 32
+
+
+def _expand(items: Iterable[Tuple[Any, Any]]) -> Optional[Set[str]]:
+    expanded = {""}
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            item = {chr(av)}
+        elif op is sre_constants.IN:
+            item = _charset_chars(av)
+        elif op is sre_constants.SUBPATTERN:
+            item = _expand(av[-1])
+        elif op is sre_constants.BRANCH:
+            item = set()
+            for branch in av[1]:
+                if (branch_strings := _expand(branch)) is None:
+                    return None
+
+                item |= branch_strings
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            min_repeats, max_repeats, repeated = av
+            if max_repeats > 3 or (repeated_strings := _expand(repeated)) is None:
+                return None
+
+            item = set()
+            for count in range(min_repeats, max_repeats + 1):
+                item.update(
+                    "".join(p)
+                    for p in itertools.product(repeated_strings, repeat=count)
+                )
+        else:
+            # anchors, any character, infinite repeats
+            return None
+
+        if item is None or len(expanded) * len(item) > _MAX_EXPANSIONS:
+            return None
+
+        expanded = {e + i for e in expanded for i in item}
+
+    return expanded
+
+
+def _literal_expansions(pattern: str, flags: Any = 0) -> Optional[FrozenSet[str]]:
+    """
+    Returns every string pattern matches, lowercase if pattern ignores case.
+    None means there are too many of them or pattern is not made of literals.
+    """
+
+    if (expanded := _expand(sre_parse.parse(pattern, flags))) is None:
+        return None
+
+    if flags & re.IGNORECASE:
+        expanded = {e.lower() for e in expanded}
+
+    return frozenset(expanded)
+
+
+def _value_outputs(value: Any) -> Optional[FrozenSet[str]]:
+    """Every string replacement value can produce, None if it is computed"""
+
+    if isinstance(value, str):
+        return frozenset((value,))
+
+    if isinstance(value, dict):
+        value = [*value.keys()]
+    elif not isinstance(value, Sequence):
+        return None
+
+    if not all(v is None or isinstance(v, str) for v in value):
+        return None
+
+    return frozenset(v for v in value if v is not None)
+
+
+def _min_growth(pattern: re.Pattern, outputs: Optional[FrozenSet[str]]) -> float:
+    """
+    Smallest number of characters replacing a match can add to text, negative
+    if it can shrink text. -inf if outputs are not known.
+    """
+
+    if not outputs:
+        return float("-inf")
+
+    _, max_width = sre_parse.parse(pattern.pattern, pattern.flags).getwidth()
+
+    return min(len(output) for output in outputs) - max_width
+
+
+def _select_weighted(rng: random.Random, cum_weights: Sequence[float]) -> int:
+    """
+    Index of randomly selected item. Same as random.choices with cum_weights,
+    including consumed random numbers, but without its per call overhead.
+    """
+
+    return bisect.bisect(
+        cum_weights, rng.random() * cum_weights[-1], 0, len(cum_weights) - 1
+    )
+
+
+def _lower(text: str) -> str:
+    if text.isascii():
+        return text.lower()
+
+    # re treats these as ascii letters in case insensitive mode, lower() does
+    # not. dotted capital i even becomes two characters, breaking literals
+    return (
+        text.replace("\u0130", "i")
+        .lower()
+        .replace("\u017f", "s")
+        .replace("\u0131", "i")
+    )
+
+
+class _BaseReplacement:
     __slots__ = (
         "pattern",
+        "required",
+        "min_growth",
+    )
+
+    pattern: re.Pattern
+    required: Optional[FrozenSet[str]]
+    # once text cannot grow by this much, nothing replacement does fits limit
+    min_growth: float
+    # called with every match, returns replacement or None to leave it as is
+    callback: Callable[[Match], _ReplacedType]
+
+    def can_match(self, text: str, lowered: str) -> bool:
+        """Cheap check telling whether it is worth running pattern over text"""
+
+        if self.required is None:
+            return True
+
+        if self.pattern.flags & re.IGNORECASE:
+            text = lowered
+
+        return any(literal in text for literal in self.required)
+
+    def _repl(
+        self, text: str, *, severity: int, context: ReplacementContext
+    ) -> Callable[[re.Match], str]:
+        """
+        Function for re.sub turning match of text into replacement. Replacements
+        that would make text longer than context limit are skipped, the ones
+        that keep length or shrink text are still made.
+        """
+
+        budget = context.limit - len(text)
+        deadline = context.deadline
+        callback = self.callback
+        min_growth = self.min_growth
+
+        def repl(match: re.Match) -> str:
+            nonlocal budget
+
+            if budget < min_growth:
+                # nothing fits anymore, callback and its random choices are
+                # not worth running
+                context.refused += 1
+
+                return match[0]
+
+            if deadline is not None and time.perf_counter() > deadline:
+                raise ReplacementTimeout
+
+            original = match[0]
+
+            replacement = callback(
+                Match(match=match, severity=severity, context=context)
+            )
+            if replacement is None:
+                return original
+
+            if (growth := len(replacement) - len(original)) > budget:
+                context.refused += 1
+
+                return original
+
+            budget -= growth
+
+            context.position += 1
+
+            if original.islower():
+                return replacement
+
+            if original.istitle():
+                if replacement.islower():
+                    # if there are some case variations better leave string untouched
+                    return replacement.title()
+
+            elif original.isupper():
+                return replacement.upper()
+
+            return replacement
+
+        return repl
+
+    def apply(self, text: str, *, severity: int, context: ReplacementContext) -> str:
+        return self.pattern.sub(
+            self._repl(text, severity=severity, context=context), text
+        )
+
+
+class Replacement(_BaseReplacement):
+    __slots__ = (
         "callback",
+        "first_chars",
     )
 
     def __init__(
         self, pattern: str, replacement: _ReplacementType, flags: Any = re.IGNORECASE
     ):
         self.pattern = re.compile(pattern, flags)
+        self.first_chars = _first_chars(self.pattern)
+        self.required = _required_literals(self.pattern, self.first_chars)
 
         self.callback = self._get_callback(replacement)
+        self.min_growth = _min_growth(self.pattern, _value_outputs(replacement))
 
     def _get_callback(self, replacement: _ReplacementType) -> _ReplacementCallableType:
         if isinstance(replacement, str):
@@ -83,7 +553,7 @@ class Replacement:
         elif isinstance(replacement, Sequence):
             # sequence of equally weighted items
             def callback_select_equal(match: Match) -> _ReplacedType:
-                selected = random.choice(replacement)
+                selected = match.rng.choice(replacement)
 
                 if isinstance(selected, str) or selected is None:
                     return selected
@@ -105,8 +575,7 @@ class Replacement:
                     computable_weights.append((i, v))
 
                     # compute for severity 1, fail early for ease of debugging
-                    # also cleans values list from functions
-                    values[i] = v(1)
+                    v(1)
 
             if not computable_weights:
                 # inject None if total weight is < 1 for convenience
@@ -115,20 +584,26 @@ class Replacement:
                     keys.append(None)
                     values.append(1 - values_sum)
 
-            # is only useful when there are no computable weights
-            # computed as early optimization
-            # https://docs.python.org/3/library/random.html#random.choices
-            cum_weights = list(itertools.accumulate(values))
+            # severity -> cumulative weights, computed once per severity.
+            # tables are never modified after creation, racing threads can only
+            # compute the same table twice
+            cum_weights_cache: Dict[int, List[float]] = {}
 
-            def callback_select_weighted(match: Match) -> _ReplacedType:
-                if computable_weights:
+            def get_cum_weights(severity: int) -> List[float]:
+                if (cum_weights := cum_weights_cache.get(severity)) is None:
+                    weights = [*values]
                     for index, fn in computable_weights:
-                        # NOTE: is this racy? without threads it's fine I guess
-                        values[index] = fn(match.severity)
+                        weights[index] = fn(severity)
+
+                    cum_weights = list(itertools.accumulate(weights))
+                    cum_weights_cache[severity] = cum_weights
 
-                    selected = random.choices(keys, weights=values)[0]
-                else:
-                    selected = random.choices(keys, cum_weights=cum_weights)[0]
+                return cum_weights
+
+            def callback_select_weighted(match: Match) -> _ReplacedType:
+                selected = keys[
+                    _select_weighted(match.rng, get_cum_weights(match.severity))
+                ]
 
                 if isinstance(selected, str) or selected is None:
                     return selected
@@ -141,45 +616,186 @@ class Replacement:
             # TODO: check
             return replacement
 
-    def apply(
-        self, text: str, *, severity: int, limit: int, context: ReplacementContext
-    ) -> str:
-        result_len = len(text)
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.pattern} => {self.callback}>"
 
-        def repl(match: re.Match) -> str:
-            nonlocal result_len
 
-            original = match[0]
+class ReplacementGroup(_BaseReplacement):
+    """
+    Several replacements fused into a single alternation pattern.
 
-            replacement = self.callback(
-                Match(match=match, severity=severity, context=context)
+    Text is scanned once, named groups dispatch each match to replacement it
+    belongs to. Replacements that match at the same position are tried in
+    original order, but unlike sequential application they never see output
+    of each other.
+
+    All replacements must have known first characters: re tries every branch
+    of alternation at every position, lookahead with combined character set
+    is what makes single pass faster than multiple ones.
+    """
+
+    __slots__ = ("replacements",)
+
+    def __init__(self, replacements: Sequence[Replacement]):
+        self.replacements = {f"r{i}": r for i, r in enumerate(replacements)}
+
+        if any(r.required is None for r in replacements):
+            self.required = None
+        else:
+            self.required = frozenset().union(*(r.required for r in replacements))
+
+        self.min_growth = min(r.min_growth for r in replacements)
+
+        patterns = [r.pattern.pattern for r in replacements]
+
+        prefix = ""
+        if all(_leading_boundary(r.pattern) for r in replacements):
+            # common for word replacements, check boundary once instead of per branch
+            prefix = r"\b"
+            patterns = [p[2:] for p in patterns]
+
+        first_chars = frozenset().union(*(r.first_chars for r in replacements))
+        prefix += f"(?=[{''.join(re.escape(c) for c in sorted(first_chars))}])"
+
+        self.pattern = re.compile(
+            prefix
+            + "(?:"
+            + "|".join(
+                f"(?P<{name}>{pattern})"
+                for name, pattern in zip(self.replacements.keys(), patterns)
             )
-            if replacement is None:
-                return original
+            + ")",
+            replacements[0].pattern.flags,
+        )
 
-            result_len += len(replacement) - len(original)
-            if result_len > limit:
-                return original
+    def callback(self, match: Match) -> _ReplacedType:
+        replacement = self.replacements[match.match.lastgroup]
+        if replacement.pattern.groups:
+            # callbacks expect groups numbered relative to their own pattern.
+            # matching single pattern at the same position gives the same result
+            match.match = replacement.pattern.match(
+                match.match.string, match.match.start()
+            )
 
-            context.position += 1
+        return replacement.callback(match)
 
-            if original.islower():
-                return replacement
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {[*self.replacements.values()]}>"
 
-            if original.istitle():
-                if replacement.islower():
-                    # if there are some case variations better leave string untouched
-                    return replacement.title()
 
-            elif original.isupper():
-                return replacement.upper()
+class WordTable(_BaseReplacement):
+    """
+    Word replacements looked up by the first word of text they match.
 
-            return replacement
+    Text is split into words once and only replacements starting with current
+    word are tried, so cost does not grow with number of words. Keys can be
+    phrases or patterns matching a few strings, like "(op|operative)s".
+
+    Replacements never see output of each other and one starting earlier in
+    text wins over one listed earlier. This gives the same text as applying them
+    one by one only if no word is produced by replacement and then matched by
+    one of the following ones and no replacement can start inside a phrase
+    listed after it, see Accent._word_tables.
+
+    Random choices are made in order of words in text instead of order of
+    replacements, so seeded output differs from separate patterns.
+    """
+
+    __slots__ = (
+        "words",
+        "replacements",
+        "_by_pattern",
+    )
+
+    WORD = re.compile(r"\w+")
+
+    # splitting text into words costs about as much as searching for 10 words
+    MIN_SIZE = 10
+
+    def __init__(self, replacements: Sequence[Tuple[FrozenSet[str], Replacement]]):
+        self.required = None
+
+        self.replacements = [r for _, r in replacements]
+
+        # first word -> replacements starting with it, in original order
+        self.words: Dict[str, List[Replacement]] = {}
+        for expansions, replacement in replacements:
+            for first_word in {self.WORD.match(e)[0] for e in expansions}:
+                self.words.setdefault(first_word, []).append(replacement)
+
+        # only words starting like one of keys are interesting
+        first_chars = sorted(set(word[0] for word in self.words.keys()))
+        self.pattern = re.compile(
+            rf"\b[{''.join(re.escape(c) for c in first_chars)}]\w*", re.IGNORECASE
+        )
+
+        self._by_pattern = {r.pattern: r for r in self.replacements}
 
-        return self.pattern.sub(repl, text)
+        self.min_growth = min(r.min_growth for r in self.replacements)
+
+    @classmethod
+    def expansions(cls, key: Any) -> Optional[FrozenSet[str]]:
+        """
+        Lowercase strings key matches, None if it cannot go to table. Every one
+        must start and end with a word character: that keeps matches aligned
+        with words of text.
+        """
+
+        if not isinstance(key, str):
+            return None
+
+        try:
+            expanded = _literal_expansions(key, re.IGNORECASE)
+        except re.error:
+            return None
+
+        if not expanded or not all(
+            cls.WORD.match(e) and cls.WORD.match(e[-1]) for e in expanded
+        ):
+            return None
+
+        return expanded
+
+    def matches(self, text: str) -> Iterator[re.Match]:
+        end = 0
+        for word in self.pattern.finditer(text):
+            # inside previous phrase
+            if word.start() < end:
+                continue
+
+            for replacement in self.words.get(_lower(word[0]), ()):
+                if (match := replacement.pattern.match(text, word.start())) is not None:
+                    end = match.end()
+
+                    yield match
+
+                    break
+
+    def apply(self, text: str, *, severity: int, context: ReplacementContext) -> str:
+        # same as re.sub with repl, but matches come from different patterns
+        repl = self._repl(text, severity=severity, context=context)
+
+        pieces = []
+        last_end = 0
+
+        for match in self.matches(text):
+            pieces.append(text[last_end : match.start()])
+            pieces.append(repl(match))
+
+            last_end = match.end()
+
+        if not pieces:
+            return text
+
+        pieces.append(text[last_end:])
+
+        return "".join(pieces)
+
+    def callback(self, match: Match) -> _ReplacedType:
+        return self._by_pattern[match.match.re].callback(match)
 
     def __repr__(self) -> str:
-        return f"<{type(self).__name__} {self.pattern} => {self.callback}>"
+        return f"<{type(self).__name__} {len(self.replacements)} words>"
 
 
 class Accent:
@@ -195,6 +811,22 @@ class Accent:
     WORD_REPLACEMENTS: Dict[Union[re.Pattern, str], Any] = {}
     REPLACEMENTS: Dict[Union[re.Pattern, str], Any] = {}
 
+    # scan text once for all replacements instead of once per replacement.
+    # only safe when replacements do not depend on output of each other
+    FUSE_REPLACEMENTS = False
+
+    # same text always gives the same result: no randomness in replacements.
+    # makes it possible to cache rendered text
+    DETERMINISTIC = False
+
+    # texts shorter than this are not checked for what replacements can match:
+    # running a few extra patterns costs less than checking all of them
+    PREFILTER_MIN_LENGTH = 300
+
+    # seconds, replacements running longer are aborted and leave text untouched.
+    # shared by all accents, disabled by default
+    RULE_TIME_BUDGET: Optional[float] = None
+
     # private class variables
     _registered_accents: Dict[str, Accent] = {}
 
@@ -206,14 +838,108 @@ class Accent:
             cls._registered_accents[str(instance).lower()] = instance
 
     def __init__(self):
-        self._replacemtns: Sequence[Replacement] = []
+        # how many times replacements were run, skipped by cheap check or aborted
+        self.replacements_executed = 0
+        self.replacements_skipped = 0
+        self.replacements_aborted = 0
 
-        for k, v in self.WORD_REPLACEMENTS.items():
-            self._replacemtns.append(Replacement(rf"\b{k}\b", v))
+        self._replacemtns: Sequence[_BaseReplacement] = []
+
+        self._replacemtns.extend(self._word_tables(self.WORD_REPLACEMENTS))
 
         for k, v in self.REPLACEMENTS.items():
             self._replacemtns.append(Replacement(k, v))
 
+        if self.FUSE_REPLACEMENTS:
+            self._replacemtns = self._fuse_replacements(self._replacemtns)
+
+    @staticmethod
+    def _word_tables(words: Dict[Any, Any]) -> List[_BaseReplacement]:
+        """
+        Replacements for words. Runs of words with known outputs go to tables
+        when that does not change result: no word is produced by replacement
+        and then matched by one of the following ones, and no replacement can
+        start in the middle of a phrase following it.
+        """
+
+        result: List[_BaseReplacement] = []
+
+        run: List[Tuple[FrozenSet[str], Replacement]] = []
+        # lowercase words of everything replacements in run can produce
+        run_outputs: Set[str] = set()
+        # words replacements in run start with
+        run_first_words: Set[str] = set()
+
+        def flush_run():
+            if len(run) >= WordTable.MIN_SIZE:
+                result.append(WordTable(run))
+            else:
+                result.extend(r for _, r in run)
+
+            run.clear()
+            run_outputs.clear()
+            run_first_words.clear()
+
+        for key, value in words.items():
+            replacement = Replacement(rf"\b{key}\b", value)
+
+            expansions = WordTable.expansions(key)
+            outputs = _value_outputs(value)
+            if expansions is None or outputs is None:
+                # keep order relative to everything else
+                flush_run()
+                result.append(replacement)
+
+                continue
+
+            key_words = [WordTable.WORD.findall(e) for e in expansions]
+            if run_outputs.intersection(w for ws in key_words for w in ws) or (
+                run_first_words.intersection(w for ws in key_words for w in ws[1:])
+            ):
+                flush_run()
+
+            run.append((expansions, replacement))
+            run_outputs.update(
+                w.lower() for output in outputs for w in WordTable.WORD.findall(output)
+            )
+            run_first_words.update(ws[0] for ws in key_words)
+
+        flush_run()
+
+        return result
+
+    @staticmethod
+    def _fuse_replacements(
+        replacements: Sequence[_BaseReplacement],
+    ) -> Sequence[_BaseReplacement]:
+        fused: Sequence[_BaseReplacement] = []
+
+        # patterns can only be joined if flags match. replacements without known
+        # first characters make combined pattern slower than separate ones.
+        # backreferences would point to wrong groups after joining
+        for (_, fusable), group in itertools.groupby(
+            replacements,
+            key=lambda r: (
+                r.pattern.flags,
+                isinstance(r, Replacement)
+                and r.first_chars is not None
+                and not _has_backreferences(r.pattern),
+            ),
+        ):
+            group = [*group]
+            if not fusable or len(group) == 1:
+                fused.extend(group)
+
+                continue
+
+            try:
+                fused.append(ReplacementGroup(group))
+            except re.error:
+                # duplicate group names, global flags in the middle of pattern etc
+                fused.extend(group)
+
+        return fused
+
     @classmethod
     def all_accents(cls) -> Sequence[Accent]:
         return list(cls._registered_accents.values())
@@ -229,18 +955,254 @@ class Accent:
         severity: int = 1,
         limit: int = 2000,
         context_data: Any = None,
+        seed: Optional[Hashable] = None,
     ) -> str:
         if severity >= 1:
-            context = ReplacementContext(data=context_data)
-            for replacement in self._replacemtns:
-                text = replacement.apply(
-                    text,
-                    severity=severity,
-                    limit=limit,
-                    context=context,
-                )
+            text = self._apply_replacements(
+                text,
+                severity=severity,
+                context=ReplacementContext(data=context_data, limit=limit, seed=seed),
+            )
+
+        return text
+
+    def apply_many(
+        self,
+        texts: Iterable[str],
+        *,
+        severity: int = 1,
+        limit: int = 2000,
+        context_data: Any = None,
+        seed: Optional[Hashable] = None,
+        executor: Optional[Executor] = None,
+    ) -> List[str]:
+        """Apply accent to each of texts, see AccentChain.apply_many"""
+
+        return AccentChain.get([self], [severity]).apply_many(
+            texts,
+            limit=limit,
+            context_data=context_data,
+            seed=seed,
+            executor=executor,
+        )
+
+    def _apply_replacements(
+        self, text: str, *, severity: int, context: ReplacementContext
+    ) -> str:
+        if filtered := len(text) >= self.PREFILTER_MIN_LENGTH:
+            lowered = _lower(text)
+
+        time_budget = self.RULE_TIME_BUDGET
+        render_deadline = context.render_deadline
+        if time_budget is None:
+            context.deadline = render_deadline
+
+        skipped = 0
+
+        for replacement in self._replacemtns:
+            if filtered and not replacement.can_match(text, lowered):
+                skipped += 1
+
+                continue
+
+            if replacement.min_growth > context.limit - len(text):
+                # every match would be refused, no need to find them
+                context.limited += 1
+                skipped += 1
+
+                continue
+
+            if time_budget is not None:
+                context.deadline = time.perf_counter() + time_budget
+                if render_deadline is not None:
+                    context.deadline = min(context.deadline, render_deadline)
+
+            try:
+                new_text = replacement.apply(text, severity=severity, context=context)
+            except ReplacementTimeout:
+                if render_deadline is not None and context.deadline == render_deadline:
+                    context.timed_out = True
+
+                    break
+
+                self.replacements_aborted += 1
+
+                continue
+
+            if new_text is not text:
+                text = new_text
+                if filtered:
+                    lowered = _lower(text)
+
+        # counted once per call, this loop runs for every replacement
+        self.replacements_skipped += skipped
+        self.replacements_executed += len(self._replacemtns) - skipped
 
         return text
 
     def __str__(self) -> str:
         return self.__class__.__name__
+
+
+class AccentChain:
+    """
+    Accents applied one after another, each with its own severity.
+
+    Chains are immutable and shared by everyone with the same accents, use get
+    instead of creating them directly.
+    """
+
+    __slots__ = (
+        "key",
+        "accents",
+        "severities",
+        "deterministic",
+        "_steps",
+        "__weakref__",
+    )
+
+    _chains: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __init__(self, accents: Sequence[Accent], severities: Sequence[int]):
+        self.accents = tuple(accents)
+        self.severities = tuple(severities)
+        self.key = tuple(zip((str(a) for a in self.accents), self.severities))
+        self.deterministic = all(
+            a.DETERMINISTIC for a, s in zip(self.accents, self.severities) if s >= 1
+        )
+
+        # resolved once instead of on every apply: accents without effect are
+        # dropped, accents with default apply go straight to replacements and
+        # share context. None means accent has custom apply
+        self._steps: Sequence[Tuple[Accent, int, Optional[Callable[..., str]]]] = []
+        for accent, severity in zip(self.accents, self.severities):
+            if severity < 1:
+                continue
+
+            if type(accent).apply is Accent.apply:
+                self._steps.append((accent, severity, accent._apply_replacements))
+            else:
+                self._steps.append((accent, severity, None))
+
+    @classmethod
+    def get(
+        cls, accents: Sequence[Accent], severities: Optional[Sequence[int]] = None
+    ) -> AccentChain:
+        if severities is None:
+            severities = [1] * len(accents)
+
+        key = tuple(zip((str(a) for a in accents), severities))
+        if (chain := cls._chains.get(key)) is None:
+            chain = cls(accents, severities)
+            cls._chains[key] = chain
+
+        return chain
+
+    @classmethod
+    def from_key(cls, key: Sequence[Tuple[str, int]]) -> AccentChain:
+        return cls.get(
+            [Accent.get_by_name(name) for name, _ in key],
+            [severity for _, severity in key],
+        )
+
+    def apply(
+        self,
+        text: str,
+        *,
+        limit: int = 2000,
+        context_data: Any = None,
+        seed: Optional[Hashable] = None,
+        context: Optional[ReplacementContext] = None,
+    ) -> str:
+        """
+        Apply accents in order. Limit is shared by the whole chain: once text
+        is close to it, replacements making text longer are skipped while the
+        rest still apply. Replacements with known outputs stop running their
+        callbacks once nothing they produce fits, and are not run at all if
+        that is the case from the start. Pass context to find out whether this
+        happened and how much of text was accented.
+
+        Output only depends on text and accents if seed is passed. If context
+        has render_deadline, rendering stops once it passes and context is
+        marked as timed out.
+        """
+
+        if context is None:
+            context = ReplacementContext(data=context_data, limit=limit, seed=seed)
+
+        for accent, severity, apply_replacements in self._steps:
+            if context.timed_out:
+                break
+
+            if apply_replacements is not None:
+                text = apply_replacements(text, severity=severity, context=context)
+
+                continue
+
+            text = accent.apply(
+                text,
+                severity=severity,
+                limit=context.limit,
+                context_data=context.data,
+                # seeded from chain generator: same seed gives the same result,
+                # custom accents following each other still get different seeds
+                seed=None if context.rng is random else context.rng.getrandbits(64),
+            )
+
+        return text
+
+    def apply_many(
+        self,
+        texts: Iterable[str],
+        *,
+        limit: int = 2000,
+        context_data: Any = None,
+        seed: Optional[Hashable] = None,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 256,
+    ) -> List[str]:
+        """
+        Apply chain to each of texts. If seed is passed, every text is rendered
+        with it, so results do not depend on order or executor.
+
+        If executor is passed, texts are split into chunks rendered by it. Accents
+        cannot be pickled, so process pool workers look them up by name and must
+        have them loaded, either inherited with fork start method or loaded by
+        pool initializer.
+        """
+
+        if executor is None:
+            return [
+                self.apply(text, limit=limit, context_data=context_data, seed=seed)
+                for text in texts
+            ]
+
+        texts = [*texts]
+        chunks = executor.map(
+            _apply_chunk,
+            itertools.repeat(self.key),
+            [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)],
+            itertools.repeat(limit),
+            itertools.repeat(context_data),
+            itertools.repeat(seed),
+        )
+
+        return [text for chunk in chunks for text in chunk]
+
+    def __bool__(self) -> bool:
+        return bool(self._steps)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.key}>"
+
+
+def _apply_chunk(
+    key: Sequence[Tuple[str, int]],
+    texts: Sequence[str],
+    limit: int,
+    context_data: Any,
+    seed: Optional[Hashable],
+) -> List[str]:
+    return AccentChain.from_key(key).apply_many(
+        texts, limit=limit, context_data=context_data, seed=seed
+    )
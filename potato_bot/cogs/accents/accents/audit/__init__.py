@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import re
+import time
+import random
+
+from typing import Dict, List, Tuple, Iterator, Optional, Sequence
+
+from ..accent import Accent, WordTable, ReplacementGroup
+
+# discord message limit
+SIZE = 2000
+# seconds per pattern and input
+BUDGET = 0.01
+
+
+class Finding:
+    __slots__ = (
+        "accent",
+        "pattern",
+        "input_name",
+        "seconds",
+    )
+
+    def __init__(
+        self, accent: Accent, pattern: re.Pattern, input_name: str, seconds: float
+    ):
+        self.accent = accent
+        self.pattern = pattern
+        # slowest input for pattern
+        self.input_name = input_name
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} accent={self.accent} pattern={self.pattern}"
+            f" input={self.input_name} seconds={self.seconds}>"
+        )
+
+
+def accent_patterns(accent: Accent) -> Iterator[Tuple[re.Pattern, Sequence[str]]]:
+    """Every pattern accent runs with literals it is built of"""
+
+    for replacement in accent._replacemtns:
+        if isinstance(replacement, ReplacementGroup):
+            members = [*replacement.replacements.values()]
+        elif isinstance(replacement, WordTable):
+            members = replacement.replacements
+        else:
+            members = []
+
+        literals = set(replacement.required or ())
+        for member in members:
+            literals.update(member.required or ())
+
+            yield member.pattern, sorted(member.required or ())
+
+        yield replacement.pattern, sorted(literals)
+
+
+def adversarial_inputs(
+    pattern: re.Pattern, literals: Sequence[str], size: int = SIZE
+) -> Dict[str, str]:
+    """
+    Inputs likely to make regex backtrack: long runs of characters pattern is
+    made of, almost matching runs cut by unexpected character, word and
+    whitespace runs, random mix of pattern characters.
+    """
+
+    def fill(unit: str) -> str:
+        return (unit * (size // len(unit) + 1))[:size]
+
+    inputs = {
+        "letters": fill("a"),
+        "words": fill("ab "),
+        "spaces": fill(" "),
+        "newlines": fill("\n"),
+        "backticks": fill("`"),
+        "codeblock": f"```{fill('a')[: size - 6]}```",
+    }
+
+    for literal in literals[:10]:
+        inputs[f"repeat {literal!r}"] = fill(literal)
+        inputs[f"repeat {literal!r} + !"] = fill(literal)[:-1] + "!"
+        inputs[f"repeat {literal!r} + spaces"] = fill(f"{literal} ")
+
+    rng = random.Random(0)
+    alphabet = sorted(set(pattern.pattern) | set("".join(literals)) | set(" \n"))
+    inputs["pattern characters"] = "".join(rng.choice(alphabet) for _ in range(size))
+
+    return inputs
+
+
+def time_pattern(pattern: re.Pattern, text: str) -> float:
+    start = time.perf_counter()
+    for _ in pattern.finditer(text):
+        pass
+
+    return time.perf_counter() - start
+
+
+def audit_accent(accent: Accent, size: int = SIZE) -> List[Finding]:
+    """Slowest input of every pattern of accent"""
+
+    findings = []
+    for pattern, literals in accent_patterns(accent):
+        timings = {
+            name: time_pattern(pattern, text)
+            for name, text in adversarial_inputs(pattern, literals, size).items()
+        }
+        worst = max(timings, key=timings.__getitem__)
+
+        findings.append(Finding(accent, pattern, worst, timings[worst]))
+
+    return findings
+
+
+def run(accents: Optional[Sequence[Accent]] = None, size: int = SIZE) -> List[Finding]:
+    if accents is None:
+        accents = Accent.all_accents()
+
+    findings = [f for accent in accents for f in audit_accent(accent, size)]
+
+    return sorted(findings, key=lambda f: f.seconds, reverse=True)
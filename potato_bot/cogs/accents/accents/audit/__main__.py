@@ -0,0 +1,42 @@
+import sys
+import argparse
+
+from . import SIZE, BUDGET, run
+from ..accent import Accent
+from ..__main__ import load_accents
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}",
+        description="Find accent patterns with bad worst case performance",
+    )
+    parser.add_argument("accents", nargs="*", help="accents to audit, all by default")
+    parser.add_argument("--size", type=int, default=SIZE, help="input length")
+    parser.add_argument(
+        "--budget", type=float, default=BUDGET, help="seconds allowed per pattern"
+    )
+    args = parser.parse_args()
+
+    load_accents()
+
+    accents = [Accent.get_by_name(name) for name in args.accents] or None
+
+    findings = run(accents, size=args.size)
+    over_budget = [f for f in findings if f.seconds > args.budget]
+
+    for finding in findings:
+        mark = "!" if finding in over_budget else " "
+        print(
+            f"{mark} {finding.seconds * 1000:>8.2f}ms {str(finding.accent):<13}"
+            f" {finding.input_name:<28} {finding.pattern.pattern[:80]}"
+        )
+
+    if over_budget:
+        print(f"\n{len(over_budget)} patterns over {args.budget}s budget")
+
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
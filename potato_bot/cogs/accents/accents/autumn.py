@@ -1,5 +1,3 @@
-import random
-
 from .accent import Match, Accent
 
 
@@ -16,7 +14,7 @@ def brrrr(m: Match):
     else:
         _go_form = forms_of_go[0][1]
 
-    return f"{_go_form} br{'r' * random.randint(1, 10)}"
+    return f"{_go_form} br{'r' * m.rng.randint(1, 10)}"
 
 
 class Autumn(Accent):
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import time
+import random
+import statistics
+
+from typing import Dict, List, Tuple, Optional, Sequence
+
+from ..accent import Accent, AccentChain
+
+# message lengths in characters, 2000 is discord limit
+SIZES = (20, 100, 500, 2000)
+SEVERITIES = (1, 5)
+
+# stacks people actually use, applied top to bottom
+COMMON_STACKS = (
+    ("OwO", "Leet"),
+    ("French", "Drunk", "Stutter"),
+    ("Slav", "Cowboy", "Autumn", "Spurdo"),
+    ("Clown", "Scotsman", "Swedish", "Dyslexic", "OwO"),
+)
+
+WORDS = (
+    "i",
+    "a",
+    "the",
+    "you",
+    "my",
+    "friend",
+    "hello",
+    "what's",
+    "going",
+    "on",
+    "with",
+    "this",
+    "round",
+    "captain",
+    "is",
+    "a",
+    "traitor",
+    "security",
+    "please",
+    "help",
+    "me",
+    "in",
+    "maint",
+    "lol",
+    "ok",
+    "nuke",
+    "ops",
+    "cheese",
+    "bread",
+    "increasing",
+    "something",
+    "very",
+    "good",
+    "bad",
+    "why",
+    "no",
+    "yes",
+    "thanks",
+    "because",
+    "let",
+)
+PUNCTUATION = (",", ".", "!", "?", "...", " :)", "\n")
+
+
+class Result:
+    __slots__ = (
+        "name",
+        "ops",
+        "p50",
+        "p99",
+    )
+
+    def __init__(self, name: str, ops: float, p50: float, p99: float):
+        self.name = name
+        # renders per second
+        self.ops = ops
+        # microseconds per render
+        self.p50 = p50
+        self.p99 = p99
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"ops": self.ops, "p50": self.p50, "p99": self.p99}
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} name={self.name} ops={self.ops:.0f}>"
+
+
+def make_message(size: int, rng: random.Random) -> str:
+    """Chat-like message of exactly given length"""
+
+    parts: List[str] = []
+    length = 0
+
+    while length < size:
+        word = rng.choice(WORDS)
+        if not parts or parts[-1].endswith((".", "!", "?", "\n")):
+            word = word.capitalize()
+        elif rng.random() < 0.03:
+            word = word.upper()
+
+        if rng.random() < 0.15:
+            word += rng.choice(PUNCTUATION)
+
+        parts.append(word)
+        length += len(word) + 1
+
+    return " ".join(parts)[:size]
+
+
+def make_corpus(
+    sizes: Sequence[int] = SIZES, per_size: int = 20, seed: int = 0
+) -> Dict[int, List[str]]:
+    rng = random.Random(seed)
+
+    return {size: [make_message(size, rng) for _ in range(per_size)] for size in sizes}
+
+
+def bench_chain(
+    name: str, chain: AccentChain, messages: Sequence[str], rounds: int
+) -> Result:
+    timings = []
+
+    for _ in range(rounds):
+        # seeded by position, choices are identical between runs
+        for i, message in enumerate(messages):
+            start = time.perf_counter()
+            chain.apply(message, seed=i)
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+
+    return Result(
+        name,
+        ops=len(timings) / sum(timings),
+        p50=statistics.median(timings) * 1e6,
+        p99=timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6,
+    )
+
+
+def cases(
+    accents: Optional[Sequence[str]] = None,
+    severities: Sequence[int] = SEVERITIES,
+) -> List[Tuple[str, AccentChain]]:
+    """Every registered accent at every severity followed by common stacks"""
+
+    if accents is None:
+        stacks = [(str(a),) for a in Accent.all_accents()] + [*COMMON_STACKS]
+    else:
+        stacks = [(a,) for a in accents]
+
+    result = []
+    for stack in stacks:
+        stack_accents = [Accent.get_by_name(a) for a in stack]
+        # names in baseline should not depend on how accents were spelled
+        stack_name = "+".join(str(a) for a in stack_accents)
+
+        for severity in severities:
+            chain = AccentChain.get(stack_accents, [severity] * len(stack))
+            result.append((f"{stack_name}:{severity}", chain))
+
+    return result
+
+
+def run(
+    accents: Optional[Sequence[str]] = None,
+    *,
+    sizes: Sequence[int] = SIZES,
+    severities: Sequence[int] = SEVERITIES,
+    rounds: int = 5,
+) -> List[Result]:
+    corpus = make_corpus(sizes)
+
+    return [
+        bench_chain(f"{name}:{size}", chain, corpus[size], rounds)
+        for name, chain in cases(accents, severities)
+        for size in sizes
+    ]
+
+
+def compare(
+    results: Sequence[Result], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[Tuple[Result, float]]:
+    """Returns results slower than baseline by more than threshold with slowdowns"""
+
+    regressions = []
+    for result in results:
+        if (previous := baseline.get(result.name)) is None:
+            continue
+
+        slowdown = 1 - result.ops / previous["ops"]
+        if slowdown > threshold:
+            regressions.append((result, slowdown))
+
+    return regressions
@@ -0,0 +1,65 @@
+import sys
+import json
+import argparse
+
+from . import SIZES, SEVERITIES, run, compare
+from ..__main__ import load_accents
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}", description="Benchmark accents"
+    )
+    parser.add_argument(
+        "accents", nargs="*", help="accents to run, all and common stacks by default"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--severities", type=int, nargs="+", default=SEVERITIES)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--save", metavar="FILE", help="write results as json")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with saved json")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed ops/sec drop compared to baseline, 0.2 is 20%%",
+    )
+    args = parser.parse_args()
+
+    load_accents()
+
+    results = run(
+        args.accents or None,
+        sizes=args.sizes,
+        severities=args.severities,
+        rounds=args.rounds,
+    )
+
+    name_width = max(len(r.name) for r in results)
+    print(f"{'case':<{name_width}} | {'ops/sec':>9} | {'p50 us':>8} | {'p99 us':>8}")
+    for result in results:
+        print(
+            f"{result.name:<{name_width}} | {result.ops:>9.0f} |"
+            f" {result.p50:>8.1f} | {result.p99:>8.1f}"
+        )
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump({r.name: r.to_dict() for r in results}, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if regressions := compare(results, baseline, args.threshold):
+            print(f"\n{len(regressions)} regressions:")
+            for result, slowdown in regressions:
+                print(f"{result.name}: {slowdown:.0%} slower")
+
+            sys.exit(1)
+
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from .accent import Accent
 
 
 class Binary(Accent):
+    DETERMINISTIC = True
+
     def apply(self, text: str, *, severity: int = 1, **kwargs: Any) -> str:
         if severity >= 1:
             return "".join(f"{ord(c):08b} " for c in text)
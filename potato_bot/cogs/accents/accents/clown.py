@@ -1,12 +1,10 @@
-import random
-
 from typing import Optional
 
 from .accent import Match, Accent
 
 
 def honk(m: Match) -> Optional[str]:
-    return f"{' HONK' * random.randint(1, 4)}!"
+    return f"{' HONK' * m.rng.randint(1, 4)}!"
 
 
 # https://github.com/unitystation/unitystation/blob/cf3bfff6563f0b3d47752e19021ab145ae318736/UnityProject/Assets/Resources/ScriptableObjects/Speech/Clown.asset
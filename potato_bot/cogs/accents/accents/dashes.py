@@ -2,6 +2,8 @@ from .accent import Accent
 
 
 class Dashes(Accent):
+    DETERMINISTIC = True
+
     REPLACEMENTS = {
         r" ": "-",
     }
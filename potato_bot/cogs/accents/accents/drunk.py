@@ -1,5 +1,3 @@
-import random
-
 from typing import Optional
 
 from .accent import Match, Accent
@@ -13,18 +11,18 @@ HICCBURPS = (
 
 
 def duplicate_char(match: Match) -> Optional[str]:
-    if random.random() > 0.8:
+    if match.rng.random() > 0.8:
         return
-    severity = random.randint(1, 6)
+    severity = match.rng.randint(1, 6)
 
     return match.original * severity
 
 
 def hiccburp(match: Match) -> Optional[str]:
-    if random.random() > 0.1:
+    if match.rng.random() > 0.1:
         return
 
-    return random.choice(HICCBURPS)
+    return match.rng.choice(HICCBURPS)
 
 
 # https://github.com/unitystation/unitystation/blob/cf3bfff6563f0b3d47752e19021ab145ae318736/UnityProject/Assets/Resources/ScriptableObjects/Speech/CustomMods/SlurredMod.cs
@@ -2,6 +2,8 @@ from .accent import Accent
 
 
 class E(Accent):
+    DETERMINISTIC = True
+
     REPLACEMENTS = {
         r"[a-z]": "e",
     }
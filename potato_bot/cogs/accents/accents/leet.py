@@ -2,6 +2,12 @@ from .accent import Accent
 
 
 class Leet(Accent):
+    DETERMINISTIC = True
+    # one scan instead of 12 makes short messages about a third cheaper. long
+    # ones are dominated by replacing almost every letter and fused pattern is
+    # about 5% slower at 2000 characters
+    FUSE_REPLACEMENTS = True
+
     # note:
     # \ should be avoided because it renders differently in codeblocks and normal text
     REPLACEMENTS = {
@@ -1,6 +1,7 @@
-import random
+import functools
+import itertools
 
-from typing import Optional
+from typing import List, Optional
 
 from .accent import Match, Accent
 
@@ -36,17 +37,25 @@ ALL_NYAS = (
 EXTREME_NYA_TRESHOLD = 5
 
 
-def nya(m: Match) -> Optional[str]:
+@functools.lru_cache(maxsize=None)
+def nya_cum_weights(severity: int) -> List[int]:
     weights = [1] * len(NYAS)
 
-    if m.severity > EXTREME_NYA_TRESHOLD:
-        weights += [m.severity - EXTREME_NYA_TRESHOLD] * len(EXTREME_NYAS)
+    if severity > EXTREME_NYA_TRESHOLD:
+        weights += [severity - EXTREME_NYA_TRESHOLD] * len(EXTREME_NYAS)
     else:
         weights += [0] * len(EXTREME_NYAS)
 
+    return list(itertools.accumulate(weights))
+
+
+def nya(m: Match) -> Optional[str]:
     return " ".join(
-        random.choices(ALL_NYAS, weights)[0]
-        for _ in range(random.randint(1, m.severity))
+        m.rng.choices(
+            ALL_NYAS,
+            cum_weights=nya_cum_weights(m.severity),
+            k=m.rng.randint(1, m.severity),
+        )
     )
 
 
@@ -62,7 +71,7 @@ class OwO(Accent):
             "owo": 0.25,
         },
         # do not break mentions by avoiding @
-        r"(?<!@)!": lambda m: f" {random.choice(NYAS)}!",
+        r"(?<!@)!": lambda m: f" {m.rng.choice(NYAS)}!",
         r"ni": "nyee",
         r"na": "nya",
         r"ne": "nye",
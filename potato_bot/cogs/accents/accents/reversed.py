@@ -4,6 +4,8 @@ from .accent import Accent
 
 
 class Reversed(Accent):
+    DETERMINISTIC = True
+
     def apply(self, text: str, *, severity: int = 1, **kwargs: Any) -> str:
         if severity >= 1:
             return text[::-1]
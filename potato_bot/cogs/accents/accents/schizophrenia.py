@@ -1,7 +1,5 @@
 import re
 
-import random
-
 from .accent import Match, Accent
 
 ending = (
@@ -88,17 +86,17 @@ topic_end = (
 
 
 def switch_topic(m: Match):
-    return " ".join(["," + random.choice(topics)] + [random.choice(topic_end)])
+    return " ".join(["," + m.rng.choice(topics)] + [m.rng.choice(topic_end)])
 
 
 def repeat_word(m: Match):
-    n = random.randint(1, 2)
+    n = m.rng.randint(1, 2)
     return " ".join(["," + m.original] * n)
 
 
 def generate_neologism(m: Match):
 
-    neologism = random.choice(start) + random.choice(ending)
+    neologism = m.rng.choice(start) + m.rng.choice(ending)
 
     return " ".join([neologism])
 
@@ -5,6 +5,8 @@ from .accent import Accent
 
 
 class SHA256(Accent):
+    DETERMINISTIC = True
+
     def apply(self, text: str, *, severity: int = 1, **kwargs: Any) -> str:
         if severity >= 1:
             return sha256(text.encode()).hexdigest()
@@ -1,5 +1,3 @@
-import random
-
 from .accent import Accent
 
 
@@ -12,9 +10,9 @@ class Spurdo(Accent):
         r"p": "b",
         r"x": "gs",
         r"\Bng\b": "gn",
-        r":?\)+": lambda m: f":{'D' * len(m.original) * random.randint(1, 5)}",
+        r":?\)+": lambda m: f":{'D' * len(m.original) * m.rng.randint(1, 5)}",
         Accent.MESSAGE_END: {
-            lambda m: f" :{'D' * random.randint(1, 5)}": 0.5,
+            lambda m: f" :{'D' * m.rng.randint(1, 5)}": 0.5,
         },
     }
 
@@ -1,15 +1,13 @@
-import random
-
 from typing import Optional
 
 from .accent import Match, Accent
 
 
 def bork(m: Match) -> Optional[str]:
-    if random.random() > 1 / 3:
+    if m.rng.random() > 1 / 3:
         return
 
-    return f" Bork{', bork' * random.randint(0, 2)}!"
+    return f" Bork{', bork' * m.rng.randint(0, 2)}!"
 
 
 # https://github.com/unitystation/unitystation/blob/cf3bfff6563f0b3d47752e19021ab145ae318736/UnityProject/Assets/Resources/ScriptableObjects/Speech/Swedish.asset
@@ -0,0 +1,149 @@
+import time
+import asyncio
+
+from typing import Deque, Callable, Optional, Awaitable
+from collections import deque
+
+import discord
+
+# discord message length limit
+MAX_CONTENT_LENGTH = 2000
+
+_SendType = Callable[[str], Awaitable[discord.WebhookMessage]]
+
+
+class TokenBucket:
+    """Allows rate actions per given number of seconds, bursts up to rate"""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate, self._tokens + (now - self._updated) * self.rate / self.per
+            )
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+
+                return
+
+            await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+
+class _Pending:
+    __slots__ = (
+        "author_id",
+        "content",
+        "mergeable",
+        "send",
+        "future",
+    )
+
+    def __init__(self, author_id: int, content: str, mergeable: bool, send: _SendType):
+        self.author_id = author_id
+        self.content = content
+        self.mergeable = mergeable
+        self.send = send
+
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class WebhookDispatcher:
+    """
+    Sends webhook messages of single channel one by one, in order they were
+    submitted, without exceeding webhook rate limit.
+
+    When messages pile up, consecutive messages of the same author are merged
+    into one if they fit, which drains backlog faster than sending each.
+    Worker task only exists while there is something to send.
+    """
+
+    def __init__(self, rate: int, per: float, coalesce: bool = True):
+        self.bucket = TokenBucket(rate, per)
+        self.coalesce = coalesce
+
+        self.queue: Deque[_Pending] = deque()
+
+        self.max_depth = 0
+        self.sent = 0
+        self.coalesced = 0
+
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(
+        self, author_id: int, content: str, *, mergeable: bool, send: _SendType
+    ) -> Optional[discord.WebhookMessage]:
+        """
+        Queue message and wait until it is sent. Returns None if message was
+        merged with others.
+        """
+
+        pending = _Pending(author_id, content, mergeable, send)
+
+        self.queue.append(pending)
+        self.max_depth = max(self.max_depth, len(self.queue))
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+        return await pending.future
+
+    @property
+    def idle(self) -> bool:
+        """Nothing queued and nothing being sent"""
+
+        return not self.queue and (self._worker is None or self._worker.done())
+
+    def _can_merge(self, batch_length: int, first: _Pending, other: _Pending) -> bool:
+        return (
+            first.mergeable
+            and other.mergeable
+            and first.author_id == other.author_id
+            # joined with newline
+            and batch_length + 1 + len(other.content) <= MAX_CONTENT_LENGTH
+        )
+
+    async def _run(self):
+        while self.queue:
+            await self.bucket.acquire()
+
+            batch = [self.queue.popleft()]
+            length = len(batch[0].content)
+
+            while (
+                self.coalesce
+                and self.queue
+                and self._can_merge(length, batch[0], self.queue[0])
+            ):
+                batch.append(self.queue.popleft())
+                length += 1 + len(batch[-1].content)
+
+            try:
+                message = await batch[0].send("\n".join(p.content for p in batch))
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+
+                continue
+
+            self.sent += 1
+            self.coalesced += len(batch) - 1
+
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_result(message if len(batch) == 1 else None)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} depth={len(self.queue)} max_depth={self.max_depth}"
+            f" sent={self.sent} coalesced={self.coalesced}>"
+        )
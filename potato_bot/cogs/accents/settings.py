@@ -0,0 +1,66 @@
+import sys
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Tuple, Iterator, Optional
+
+
+class GuildSettings:
+    """
+    Accent stack ids of users of single guild.
+
+    Kept in two parallel arrays sorted by user id rather than dict: about 12
+    bytes per user instead of a hundred, lookups are binary searches. Changes
+    are rare compared to lookups, so cost of inserting into array is fine.
+    """
+
+    __slots__ = (
+        "user_ids",
+        "stack_ids",
+    )
+
+    def __init__(self, users: Optional[Dict[int, int]] = None):
+        items = sorted(users.items()) if users else []
+
+        self.user_ids = array("Q", (user_id for user_id, _ in items))
+        self.stack_ids = array("I", (stack_id for _, stack_id in items))
+
+    def _find(self, user_id: int) -> Tuple[int, bool]:
+        index = bisect_left(self.user_ids, user_id)
+
+        return index, index < len(self.user_ids) and self.user_ids[index] == user_id
+
+    def get(self, user_id: int) -> Optional[int]:
+        index, found = self._find(user_id)
+
+        return self.stack_ids[index] if found else None
+
+    def set(self, user_id: int, stack_id: int) -> None:
+        index, found = self._find(user_id)
+        if found:
+            self.stack_ids[index] = stack_id
+        else:
+            self.user_ids.insert(index, user_id)
+            self.stack_ids.insert(index, stack_id)
+
+    def remove(self, user_id: int) -> None:
+        index, found = self._find(user_id)
+        if found:
+            del self.user_ids[index]
+            del self.stack_ids[index]
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.user_ids, self.stack_ids)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self.user_ids)
+            + sys.getsizeof(self.stack_ids)
+        )
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} users={len(self)}>"
@@ -1,5 +1,6 @@
 import io
 import copy
+import json
 import random
 import asyncio
 import textwrap
@@ -155,6 +156,58 @@ class TechAdmin(Cog):
 
             await self._send_paginator(ctx, paginator)
 
+    @commands.command()
+    async def hooks(self, ctx):
+        """Show effective hook chains of context methods, outermost first"""
+
+        lines = []
+        for name in ctx.hookable_names():
+            lines.append(f"{name}:")
+
+            for hook in ctx.hook_chain(name):
+                flags = " transform" if hook.__hook_transform__ else ""
+                lines.append(
+                    f"  {hook.__hook_priority__:>3} {hook.__qualname__}{flags}"
+                )
+
+        await ctx.send("```\n" + "\n".join(lines) + "```", accents=[])
+
+    @commands.group(invoke_without_command=True, ignore_extra=False)
+    async def hookstats(self, ctx):
+        """Show time added by each hook and hookable context method"""
+
+        if (timings := ctx.__hook_timings__) is None:
+            return await ctx.send("Hook timings are disabled", accents=[])
+
+        paginator = self._make_paginator(timings.format())
+
+        await self._send_paginator(ctx, paginator)
+
+    @hookstats.command(name="enable")
+    async def hookstats_enable(self, ctx, samples: int = 1000):
+        """Start recording hook timings, resets existing data"""
+
+        type(ctx).enable_timings(samples)
+        await ctx.ok()
+
+    @hookstats.command(name="disable")
+    async def hookstats_disable(self, ctx):
+        """Stop recording hook timings"""
+
+        type(ctx).disable_timings()
+        await ctx.ok()
+
+    @hookstats.command(name="json")
+    async def hookstats_json(self, ctx):
+        """Dump hook timings as JSON, durations are in seconds"""
+
+        if (timings := ctx.__hook_timings__) is None:
+            return await ctx.send("Hook timings are disabled", accents=[])
+
+        data = json.dumps(timings.to_dict(), indent=2).encode()
+
+        await ctx.send(file=discord.File(io.BytesIO(data), "hookstats.json"))
+
     async def _eval(self, ctx, program) -> str:
         # copied from https://github.com/Fogapod/KiwiBot/blob/49743118661abecaab86388cb94ff8a99f9011a8/modules/owner/module_eval.py
         # (originally copied from R. Danny bot)
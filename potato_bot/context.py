@@ -1,3 +1,5 @@
+import os
+
 from typing import Any, Union, Optional
 
 import aiohttp
@@ -103,3 +105,7 @@ class Context(commands.Context, AsyncHookable):
             message = self.message
 
         return await self.react("\N{HEAVY MULTIPLICATION X}", message=message)
+
+
+if os.environ.get("HOOK_TIMINGS", "0") == "1":
+    Context.enable_timings()
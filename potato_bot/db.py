@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from typing import Any
@@ -16,6 +17,10 @@ class DB:
 
         self._conn = None
 
+        # connection is shared, statements of transactions running at the same
+        # time would end up in one of them
+        self._transaction_lock = asyncio.Lock()
+
         self._db_path = Path("db.sqlite")
 
     async def connect(self):
@@ -66,6 +71,36 @@ class DB:
     async def commit(self):
         await self._conn.commit()
 
+    async def _begin(self):
+        await asyncio.wait_for(
+            self._transaction_lock.acquire(), timeout=self._acquire_timeout
+        )
+
+        try:
+            # sqlite3 would only start transaction at first modifying statement,
+            # reads before it would not be part of it
+            if not self._conn.in_transaction:
+                await self._conn.execute("BEGIN")
+        except BaseException:
+            self._transaction_lock.release()
+
+            raise
+
+    async def _end(self, commit: bool):
+        try:
+            if commit:
+                try:
+                    await self._conn.commit()
+                except BaseException:
+                    # failed commit leaves transaction open for the next one
+                    await self._conn.rollback()
+
+                    raise
+            else:
+                await self._conn.rollback()
+        finally:
+            self._transaction_lock.release()
+
     def cursor(self, *, commit: bool = False) -> _CursorContext:
         return _CursorContext(self, commit)
 
@@ -74,18 +109,34 @@ class DB:
 
 
 class _DBContext:
+    """
+    With commit everything inside runs in one transaction, committed at exit or
+    rolled back on error. Transactions wait for each other.
+    """
+
     def __init__(self, db: DB, commit: bool):
         self.db = db
         self.commit = commit
 
     async def __aenter__(self) -> Any:
-        return await self.enter()
+        if not self.commit:
+            return await self.enter()
 
-    async def __aexit__(self, exc_type, exc, tb):
-        if exc_type is None and self.commit:
-            await self.db.commit()
+        await self.db._begin()
 
-        await self.exit()
+        try:
+            return await self.enter()
+        except BaseException:
+            await self.db._end(commit=False)
+
+            raise
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self.exit()
+        finally:
+            if self.commit:
+                await self.db._end(commit=exc_type is None)
 
     async def enter(self) -> Any:
         pass
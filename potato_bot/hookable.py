@@ -1,18 +1,98 @@
+import time
 import inspect
 
 from typing import Any, Dict, List, Iterator, Optional
 from functools import wraps, partial, update_wrapper
+from contextvars import ContextVar
+
+from .utils import Timings
 
 # TODO
 _HookType = Any
 
+# time spent below current link of chain, used to get time added by each hook
+_inner_time: ContextVar[List[float]] = ContextVar("_inner_time")
+
 
 class AsyncHookable:
     __hooks__: Dict[str, List[_HookType]] = {}
+    # original function -> handler with all hooks applied. built on first call,
+    # dropped when hooks change
+    __hook_chains__: Dict[Any, _HookType] = {}
+    # optional instrumentation, wraps every link of chain when set
+    __hook_timings__: Optional[Timings] = None
 
     def _hooks_for(self, name: str) -> Iterator[_HookType]:
         yield from self.__hooks__.get(name, [])
 
+    @classmethod
+    def hookable_names(cls) -> List[str]:
+        return [
+            name
+            for name in dir(cls)
+            if hasattr(getattr(cls, name, None), "__original__")
+        ]
+
+    @classmethod
+    def hook_chain(cls, name: str) -> List[_HookType]:
+        """Hooks for function in the order they are called, outermost first"""
+
+        # stable sort: same priority hooks keep registration order, last
+        # registered wraps everything before it
+        return sorted(
+            reversed(cls.__hooks__.get(name, [])),
+            key=lambda hook: hook.__hook_priority__,
+            reverse=True,
+        )
+
+    @classmethod
+    def enable_timings(cls, samples: int = 1000):
+        cls.__hook_timings__ = Timings(samples)
+        cls.__hook_chains__.clear()
+
+    @classmethod
+    def disable_timings(cls):
+        cls.__hook_timings__ = None
+        cls.__hook_chains__.clear()
+
+    @staticmethod
+    def _timed(
+        handler: _HookType, timings: Timings, stage: str, exclusive: bool = True
+    ) -> _HookType:
+        async def timed(*args, **kwargs):
+            inner = [0.0]
+            token = _inner_time.set(inner)
+            start = time.perf_counter()
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _inner_time.reset(token)
+
+                timings.add(stage, elapsed - inner[0] if exclusive else elapsed)
+
+                if (outer := _inner_time.get(None)) is not None:
+                    outer[0] += elapsed
+
+        return update_wrapper(timed, handler)
+
+    @staticmethod
+    def _strip_final(handler: _HookType) -> _HookType:
+        async def stripped(self, *args, final: bool = False, **kwargs):
+            return await handler(self, *args, **kwargs)
+
+        return update_wrapper(stripped, handler)
+
+    @staticmethod
+    def _skip_if_final(hook: _HookType, handler: _HookType) -> _HookType:
+        async def skipped(self, *args, **kwargs):
+            if kwargs.get("final", False):
+                return await handler(self, *args, **kwargs)
+
+            return await hook(self, *args, **kwargs)
+
+        return update_wrapper(skipped, handler)
+
     @classmethod
     def hookable(cls):
         def decorator(func):
@@ -20,12 +100,33 @@ class AsyncHookable:
 
             @wraps(func)
             async def wrapped(self, *args, **kwargs):
-                handler = getattr(self, name).__original__
-
-                # thanks aiohttp
-                # https://github.com/aio-libs/aiohttp/blob/3edc43c1bb718b01a1fbd67b01937cff9058e437/aiohttp/web_app.py#L346-L350
-                for hook in self._hooks_for(name):
-                    handler = update_wrapper(partial(hook, handler), handler)
+                if (handler := self.__hook_chains__.get(func)) is None:
+                    timings = self.__hook_timings__
+
+                    # final is only meaningful for hooks, function never sees it
+                    handler = self._strip_final(func)
+                    if timings is not None:
+                        handler = self._timed(
+                            handler, timings, f"{name}:{func.__qualname__}"
+                        )
+
+                    # thanks aiohttp
+                    # https://github.com/aio-libs/aiohttp/blob/3edc43c1bb718b01a1fbd67b01937cff9058e437/aiohttp/web_app.py#L346-L350
+                    for hook in reversed(self.hook_chain(name)):
+                        link = update_wrapper(partial(hook, handler), handler)
+                        if timings is not None:
+                            link = self._timed(
+                                link, timings, f"{name}:{hook.__qualname__}"
+                            )
+                        if hook.__hook_transform__:
+                            link = self._skip_if_final(link, handler)
+
+                        handler = link
+
+                    if timings is not None:
+                        handler = self._timed(handler, timings, name, exclusive=False)
+
+                    self.__hook_chains__[func] = handler
 
                 return await handler(self, *args, **kwargs)
 
@@ -36,7 +137,17 @@ class AsyncHookable:
         return decorator
 
     @classmethod
-    def hook(cls, name: Optional[str] = None):
+    def hook(
+        cls, name: Optional[str] = None, *, priority: int = 0, transform: bool = False
+    ):
+        """
+        Register hook for hookable function.
+
+        Hooks with higher priority are called first, of equal priority the last
+        registered is called first. Transform hooks are skipped once content is
+        marked final by passing final=True down the chain.
+        """
+
         def decorator(func):
             if not inspect.iscoroutinefunction(func):
                 raise TypeError("Not a coroutine")
@@ -58,12 +169,16 @@ class AsyncHookable:
 
             func.__hook_name__ = name
             func.__hook_target__ = cls
+            func.__hook_priority__ = priority
+            func.__hook_transform__ = transform
 
             if name in cls.__hooks__:
                 cls.__hooks__[name].append(func)
             else:
                 cls.__hooks__[name] = [func]
 
+            cls.__hook_chains__.clear()
+
             return func
 
         return decorator
@@ -76,3 +191,5 @@ class AsyncHookable:
                 cls.__hooks__[name].remove(hook)
             except ValueError:
                 pass
+
+        cls.__hook_chains__.clear()
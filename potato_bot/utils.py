@@ -1,6 +1,9 @@
+import time
 import asyncio
 
-from collections import OrderedDict
+from typing import Any, Dict, Deque, Iterator, Optional
+from contextlib import contextmanager
+from collections import OrderedDict, deque
 
 
 async def run_process(cmd, *args):
@@ -68,3 +71,87 @@ class LRU(OrderedDict):
         if len(self) > self.maxsize:
             oldest = next(iter(self))
             del self[oldest]
+
+
+class Timings:
+    """
+    Number of runs and total duration of named stages.
+
+    If samples is set, that many latest durations are kept per stage for
+    percentiles.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, samples: Optional[int] = None):
+        self.counts: Dict[str, int] = {}
+        self.totals: Dict[str, float] = {}
+
+        self.samples = samples
+        self.recent: Dict[str, Deque[float]] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        self.totals[stage] = self.totals.get(stage, 0) + seconds
+
+        if self.samples is not None:
+            if (recent := self.recent.get(stage)) is None:
+                recent = self.recent[stage] = deque(maxlen=self.samples)
+
+            recent.append(seconds)
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def percentile(self, stage: str, percent: float) -> Optional[float]:
+        if not (recent := self.recent.get(stage)):
+            return None
+
+        ordered = sorted(recent)
+
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for stage, count in self.counts.items():
+            total = self.totals[stage]
+            result[stage] = {
+                "count": count,
+                "total": total,
+                "avg": total / count,
+            }
+
+            if self.samples is not None:
+                for percent in self.PERCENTILES:
+                    result[stage][f"p{percent}"] = self.percentile(stage, percent)
+
+        return result
+
+    def format(self) -> str:
+        width = max((len(stage) for stage in self.counts), default=0)
+
+        header = f"{'stage':<{width}} |    count |   avg us |  total ms"
+        if self.samples is not None:
+            header += "".join(f" | {f'p{p} us':>8}" for p in self.PERCENTILES)
+
+        lines = [header]
+        for stage, count in self.counts.items():
+            total = self.totals[stage]
+            line = (
+                f"{stage:<{width}} | {count:>8} | {total / count * 1e6:>8.1f} |"
+                f" {total * 1e3:>9.1f}"
+            )
+
+            if self.samples is not None:
+                for percent in self.PERCENTILES:
+                    value = self.percentile(stage, percent)
+                    line += f" | {value * 1e6:>8.1f}"
+
+            lines.append(line)
+
+        return "\n".join(lines)
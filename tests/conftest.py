@@ -0,0 +1,4 @@
+import os
+
+# importing accents imports the cog package, which reads prefix from environment
+os.environ.setdefault("BOT_PREFIX", "!")
@@ -0,0 +1,300 @@
+import random
+
+import pytest
+
+from potato_bot.cogs.accents.accents.bench import make_corpus, make_message
+from potato_bot.cogs.accents.accents.accent import (
+    Accent,
+    WordTable,
+    AccentChain,
+    Replacement,
+    ReplacementContext,
+)
+from potato_bot.cogs.accents.accents.__main__ import load_accents
+
+load_accents()
+
+CORPUS = make_corpus((20, 100, 500, 2000), per_size=10)
+
+PHRASES = (
+    "I am here",
+    "I'm here",
+    "i am THE captain and my friend is a traitor",
+    "JE SUIS HERE",
+)
+
+OPTIMIZED = [
+    a for a in Accent.all_accents() if a.FUSE_REPLACEMENTS or a.WORD_REPLACEMENTS
+]
+
+
+class FixedRandom(random.Random):
+    """Every random choice is the same no matter in which order they are made"""
+
+    def random(self):
+        return 0.0
+
+    def getrandbits(self, k):
+        return 0
+
+
+def accent_messages(accent, count=20, seed=0):
+    """Messages made of words accent replaces, in random order and case"""
+
+    rng = random.Random(seed)
+    words = [k for k in accent.WORD_REPLACEMENTS if isinstance(k, str) and k.isalpha()]
+    if not words:
+        return []
+
+    messages = []
+    for _ in range(count):
+        message_words = rng.choices(words, k=rng.randint(1, 30))
+        messages.append(
+            " ".join(
+                rng.choice((str.lower, str.title, str.upper))(w) for w in message_words
+            )
+        )
+
+    return messages
+
+
+@pytest.mark.parametrize("accent", OPTIMIZED, ids=str)
+def test_optimized_output_matches_sequential(accent, monkeypatch):
+    # reference applies every replacement separately, like the original code
+    monkeypatch.setattr(WordTable, "MIN_SIZE", float("inf"))
+
+    class Sequential(type(accent), is_accent=False):
+        FUSE_REPLACEMENTS = False
+
+    sequential = Sequential()
+
+    assert all(type(r) is Replacement for r in sequential._replacemtns)
+
+    messages = [
+        *PHRASES,
+        *accent_messages(accent),
+        *(m for ms in CORPUS.values() for m in ms),
+    ]
+
+    # word tables make random choices and skip replacements over the limit in
+    # order of text, only fixed choices within limit give the same output
+    def apply(accent, message, severity):
+        context = ReplacementContext()
+        context.rng = FixedRandom()
+
+        text = accent._apply_replacements(message, severity=severity, context=context)
+
+        return text, context.exhausted
+
+    for severity in (1, 5, 10):
+        for message in messages:
+            optimized, optimized_exhausted = apply(accent, message, severity)
+            expected, expected_exhausted = apply(sequential, message, severity)
+
+            if optimized_exhausted or expected_exhausted:
+                assert len(optimized) <= 2000
+
+                continue
+
+            assert optimized == expected
+
+
+def test_word_table_keeps_order():
+    class Words(Accent, is_accent=False):
+        WORD_REPLACEMENTS = {
+            **{
+                w: w.upper()
+                for w in "one two three four five six seven eight nine ten".split()
+            },
+            # needs output of "one", goes to the next table
+            "ONE": "uno",
+            **{w: "x" for w in "a b c d e f g h i".split()},
+        }
+
+    accent = Words()
+
+    assert [type(r).__name__ for r in accent._replacemtns] == ["WordTable", "WordTable"]
+    assert accent.apply("one two a b ten") == "UNO TWO x x TEN"
+    assert accent.apply("One nine I") == "UNO NINE X"
+
+
+def test_word_table_phrases():
+    fillers = {w: w[::-1] for w in "one two three four five six seven eight".split()}
+
+    class Phrases(Accent, is_accent=False):
+        WORD_REPLACEMENTS = {
+            "am": "suis",
+            **fillers,
+            r"(op|operative)s?": "boche",
+            # "am" is replaced first and can be in the middle of phrase, next table
+            "i am": "je suis",
+            "i": "je",
+            **{f"x{w}": w for w in fillers},
+        }
+
+    accent = Phrases()
+
+    assert [type(r).__name__ for r in accent._replacemtns] == ["WordTable", "WordTable"]
+    assert accent.apply("I am an Operative, ops") == "Je suis an Boche, boche"
+    assert accent.apply("i am xone one") == "je suis one eno"
+
+
+def test_word_table_draws_in_text_order():
+    words = "one two three four five six seven eight nine ten".split()
+
+    class Choices(Accent, is_accent=False):
+        WORD_REPLACEMENTS = {w: (f"{w}1", f"{w}2", f"{w}3") for w in words}
+
+    accent = Choices()
+    assert [type(r).__name__ for r in accent._replacemtns] == ["WordTable"]
+
+    rng = random.Random(5)
+    expected = " ".join(
+        rng.choice((f"{w}1", f"{w}2", f"{w}3")) for w in ("ten", "one", "five")
+    )
+
+    assert accent.apply("ten one five", seed=5) == expected
+
+
+def test_shipped_dictionaries_use_tables():
+    french = Accent.get_by_name("french")
+
+    assert any(isinstance(r, WordTable) for r in french._replacemtns)
+    assert len(french._replacemtns) < len(french.WORD_REPLACEMENTS) // 4
+
+
+def test_backreferences_are_not_fused():
+    class Doubles(Accent, is_accent=False):
+        FUSE_REPLACEMENTS = True
+
+        REPLACEMENTS = {
+            r"b": "y",
+            r"(a)\1": "x",
+            r"c": "z",
+            r"d": "w",
+        }
+
+    accent = Doubles()
+
+    assert [type(r).__name__ for r in accent._replacemtns] == [
+        "Replacement",
+        "Replacement",
+        "ReplacementGroup",
+    ]
+    assert accent.apply("aabcd a") == "xyzw a"
+
+
+def test_boundary_of_first_branch_is_not_shared():
+    class Branches(Accent, is_accent=False):
+        FUSE_REPLACEMENTS = True
+
+        REPLACEMENTS = {
+            r"\bx|y": "1",
+            r"\bz": "2",
+        }
+
+    class Sequential(Branches, is_accent=False):
+        FUSE_REPLACEMENTS = False
+
+    assert [type(r).__name__ for r in Branches()._replacemtns] == ["ReplacementGroup"]
+    assert Branches().apply("ay az xa") == Sequential().apply("ay az xa") == "a1 az 1a"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_limit_does_not_stop_later_accents(seed):
+    owo = Accent.get_by_name("owo")
+    leet = Accent.get_by_name("leet")
+
+    message = make_message(1990, random.Random(seed))
+    chain = AccentChain.get([owo, leet], [10, 10])
+
+    context = ReplacementContext(seed=seed)
+    result = chain.apply(message, context=context)
+
+    # OwO is applied first, Leet does not change length and must not be stopped
+    # by growing replacements of OwO
+    assert context.exhausted
+    assert len(result) <= 2000
+
+    expected = leet.apply(owo.apply(message, severity=10, seed=seed), severity=10)
+    assert result == expected
+    # nothing is left for Leet to replace
+    assert leet.apply(result) == result
+
+
+def test_limit_stops_growing_callbacks():
+    class CountingRandom(random.Random):
+        choices_made = 0
+
+        def choice(self, seq):
+            self.choices_made += 1
+
+            return super().choice(seq)
+
+    class Growing(Accent, is_accent=False):
+        REPLACEMENTS = {
+            r"a": ("xx", "yy"),
+            Accent.MESSAGE_END: " blyat",
+        }
+
+    context = ReplacementContext(limit=15)
+    context.rng = CountingRandom(0)
+
+    result = Growing()._apply_replacements("a" * 10, severity=1, context=context)
+
+    # 5 replacements fit, the rest is refused without making random choices
+    assert len(result) == 15
+    assert context.rng.choices_made == 5
+    assert context.refused == 5
+    assert context.accented == 0.5
+    # message end cannot grow text and is not run at all
+    assert context.limited == 1
+    assert context.exhausted
+
+
+def test_short_text_is_not_prefiltered():
+    owo = Accent.get_by_name("owo")
+
+    skipped = owo.replacements_skipped
+    owo.apply("hello there friend", severity=5)
+    assert owo.replacements_skipped == skipped
+
+    owo.apply(make_message(Accent.PREFILTER_MIN_LENGTH, random.Random(0)), severity=5)
+    assert owo.replacements_skipped > skipped
+
+
+@pytest.mark.parametrize("accent", Accent.all_accents(), ids=str)
+def test_prefilter_keeps_non_ascii_output(accent, monkeypatch):
+    # characters re matches with ascii letters when ignoring case
+    lookalikes = {"i": "\u0130\u0131", "s": "\u017f", "k": "\u212a"}
+
+    rng = random.Random(0)
+    messages = [
+        "".join(
+            rng.choice(lookalikes[c]) if c in lookalikes and rng.random() < 0.5 else c
+            for c in message
+        )
+        for message in (*PHRASES, "my frIend", *CORPUS[100], *CORPUS[500])
+    ]
+
+    def render(prefilter_min_length):
+        monkeypatch.setattr(Accent, "PREFILTER_MIN_LENGTH", prefilter_min_length)
+
+        return [accent.apply(m, severity=5, seed=i) for i, m in enumerate(messages)]
+
+    assert render(0) == render(float("inf"))
+
+
+def test_custom_apply_is_seeded():
+    class Shuffled(Accent, is_accent=False):
+        def apply(self, text, *, severity=1, seed=None, **kwargs):
+            words = text.split()
+            random.Random(seed).shuffle(words)
+
+            return " ".join(words)
+
+    chain = AccentChain.get([Shuffled(), Accent.get_by_name("owo")], [1, 5])
+    message = make_message(500, random.Random(0))
+
+    assert chain.apply(message, seed=1) == chain.apply(message, seed=1)
+    assert chain.apply(message, seed=1) != chain.apply(message, seed=2)
@@ -0,0 +1,56 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from discord.ext import commands
+
+from potato_bot.bot import Bot
+from potato_bot.utils import LRU
+
+
+def make_bot() -> Bot:
+    # real constructor connects to database and loads extensions
+    bot = Bot.__new__(Bot)
+    commands.Bot.__init__(bot, command_prefix="!")
+
+    bot._prefix_matchers = LRU(64)
+    bot._parsed_messages = LRU(256)
+    bot._connection.user = SimpleNamespace(id=0)
+
+    return bot
+
+
+def test_memoized_context_can_be_invoked_again():
+    async def check():
+        bot = make_bot()
+        calls = []
+
+        @bot.command()
+        async def echo(ctx, word: str):
+            calls.append(word)
+
+        message = SimpleNamespace(
+            id=1,
+            author=SimpleNamespace(id=2, bot=False),
+            content="!echo potato",
+            guild=SimpleNamespace(),
+            _state=None,
+        )
+
+        first = await bot.get_context(message)
+        await bot.invoke(first)
+
+        second = await bot.get_context(message)
+        assert second is not first
+        assert (second.prefix, second.invoked_with, second.command) == (
+            first.prefix,
+            first.invoked_with,
+            first.command,
+        )
+
+        await bot.invoke(second)
+
+        assert calls == ["potato", "potato"]
+        assert second.args[1:] == first.args[1:]
+
+    asyncio.run(check())
@@ -0,0 +1,214 @@
+import asyncio
+
+from types import SimpleNamespace
+from pathlib import Path
+from weakref import WeakValueDictionary
+from collections import OrderedDict
+
+import pytest
+
+from potato_bot.db import DB
+from potato_bot.utils import LRU
+from potato_bot.cogs.accents import Accents
+from potato_bot.cogs.accents.dispatch import WebhookDispatcher
+from potato_bot.cogs.accents.accents.accent import Accent
+from potato_bot.cogs.accents.accents.__main__ import load_accents
+
+load_accents()
+
+ROOT = Path(__file__).parent.parent
+
+GUILD_ID = 1
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # migrations are looked up relative to working directory
+    monkeypatch.chdir(ROOT)
+
+    db = DB()
+    db._db_path = tmp_path / "db.sqlite"
+
+    asyncio.run(db.connect())
+    monkeypatch.setattr(Accents, "_db", db)
+    monkeypatch.setattr(Accents, "accent_settings", LRU(8))
+
+    yield db
+
+    asyncio.run(db.close())
+
+
+def test_unknown_accent_is_skipped(db):
+    async def fill():
+        async with db.cursor(commit=True) as cur:
+            await cur.executemany(
+                """
+                INSERT INTO user_accent (guild_id, user_id, accent, severity)
+                VALUES (?, ?, ?, ?)
+                """,
+                [
+                    (GUILD_ID, 1, "removed accent", 1),
+                    (GUILD_ID, 1, "owo", 2),
+                    (GUILD_ID, 2, "removed accent", 1),
+                ],
+            )
+
+        return (
+            await Accents.get_user_accents(GUILD_ID, 1),
+            await Accents.get_user_accents(GUILD_ID, 2),
+        )
+
+    first, second = asyncio.run(fill())
+
+    assert list(first) == [Accent.get_by_name("owo")]
+    assert list(second) == []
+
+
+def test_busy_dispatchers_are_not_evicted(monkeypatch):
+    async def check():
+        monkeypatch.setattr(Accents, "WEBHOOK_CACHE_SIZE", 2)
+
+        cog = Accents.__new__(Accents)
+        cog._dispatchers = OrderedDict()
+
+        sending = asyncio.Event()
+        release = asyncio.Event()
+
+        async def send(content):
+            sending.set()
+            await release.wait()
+
+        busy = WebhookDispatcher(5, 5)
+        cog._dispatchers[1] = busy
+        submit = asyncio.ensure_future(busy.submit(1, "a", mergeable=True, send=send))
+        await sending.wait()
+
+        for channel_id in (2, 3, 4):
+            cog._dispatchers[channel_id] = WebhookDispatcher(5, 5)
+            cog._evict_dispatchers()
+
+        assert not busy.idle
+        assert list(cog._dispatchers) == [1, 4]
+
+        release.set()
+        await submit
+
+        assert busy.idle
+
+    asyncio.run(check())
+
+
+def test_concurrent_changes_are_not_lost(db):
+    cog = Accents.__new__(Accents)
+    cog.bot = SimpleNamespace(db=db)
+    cog._user_locks = WeakValueDictionary()
+
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=GUILD_ID))
+    names = ("owo", "leet", "clown", "french")
+
+    async def change():
+        await asyncio.gather(
+            *(
+                cog._add_accents(ctx, 1, [(Accent.get_by_name(name), 1)])
+                for name in names
+            )
+        )
+
+        loaded = await Accents.get_user_accents(GUILD_ID, 1)
+
+        Accents.accent_settings.clear()
+
+        return loaded, await Accents.get_user_accents(GUILD_ID, 1)
+
+    loaded, stored = asyncio.run(change())
+
+    assert sorted(map(str, loaded)) == sorted(map(str, stored))
+    assert len(stored) == len(names)
+
+
+def _cog(db):
+    cog = Accents.__new__(Accents)
+    cog.bot = SimpleNamespace(db=db)
+    cog._user_locks = WeakValueDictionary()
+
+    return cog
+
+
+async def _stored(db, user_id):
+    async with db.cursor() as cur:
+        await cur.execute(
+            """
+            SELECT accent, severity
+            FROM user_accent
+            WHERE guild_id = ? AND user_id = ?
+            ORDER BY rowid
+            """,
+            (GUILD_ID, user_id),
+        )
+
+        return [tuple(row) for row in await cur.fetchall()]
+
+
+def test_unknown_accent_rows_are_kept(db):
+    cog = _cog(db)
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=GUILD_ID))
+
+    async def change():
+        async with db.cursor(commit=True) as cur:
+            await cur.executemany(
+                """
+                INSERT INTO user_accent (guild_id, user_id, accent, severity)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(GUILD_ID, 1, "removed accent", 1), (GUILD_ID, 1, "OwO", 2)],
+            )
+
+        await cog._add_accents(ctx, 1, [(Accent.get_by_name("leet"), 1)])
+
+        return await _stored(db, 1)
+
+    assert asyncio.run(change()) == [
+        ("removed accent", 1),
+        ("OwO", 2),
+        ("Leet", 1),
+    ]
+
+
+def test_failed_change_is_rolled_back(db):
+    cog = _cog(db)
+    owo, leet, french = map(Accent.get_by_name, ("owo", "leet", "french"))
+
+    async def change():
+        await cog.set_accent_stacks({(GUILD_ID, 1): [(owo, 1), (leet, 2)]})
+
+        async with db.cursor(commit=True) as cur:
+            await cur.execute("""
+                CREATE TRIGGER fail_insert BEFORE INSERT ON user_accent
+                WHEN NEW.accent = 'French'
+                BEGIN
+                    SELECT RAISE(ABORT, 'failed');
+                END
+                """)
+
+        before = await _stored(db, 1)
+
+        with pytest.raises(Exception, match="failed"):
+            await cog.set_accent_stacks({(GUILD_ID, 1): [(leet, 2), (french, 1)]})
+
+        # unrelated write must not commit half of failed change
+        async with db.cursor(commit=True) as cur:
+            await cur.execute(
+                "INSERT INTO user_accent (guild_id, user_id, accent, severity)"
+                " VALUES (?, ?, ?, ?)",
+                (GUILD_ID, 2, "OwO", 1),
+            )
+
+        loaded = await Accents.get_user_accents(GUILD_ID, 1)
+
+        return before, await _stored(db, 1), loaded
+
+    before, after, loaded = asyncio.run(change())
+
+    assert before == [("OwO", 1), ("Leet", 2)]
+    assert after == before
+    assert list(loaded) == [owo, leet]
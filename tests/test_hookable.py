@@ -0,0 +1,98 @@
+import asyncio
+
+from potato_bot.hookable import AsyncHookable
+
+
+class _Target(AsyncHookable):
+    @AsyncHookable.hookable()
+    async def test_send(self, content):
+        return content
+
+    @AsyncHookable.hookable()
+    async def test_order(self, content, **kwargs):
+        return content, kwargs
+
+
+def test_chain_is_rebuilt_when_hooks_change():
+    target = _Target()
+
+    async def first(original, target, content):
+        return await original(target, content + " first")
+
+    async def second(original, target, content):
+        return await original(target, content + " second")
+
+    async def send():
+        return await target.test_send("message")
+
+    try:
+        assert asyncio.run(send()) == "message"
+
+        _Target.hook("test_send")(first)
+        assert asyncio.run(send()) == "message first"
+
+        _Target.hook("test_send")(second)
+        assert asyncio.run(send()) == "message second first"
+
+        _Target.remove_hook(first)
+        assert asyncio.run(send()) == "message second"
+
+        _Target.remove_hook(second)
+        assert asyncio.run(send()) == "message"
+    finally:
+        for hook in list(_Target.__hooks__.get("test_send", [])):
+            _Target.remove_hook(hook)
+
+
+def test_hook_order_and_final():
+    calls = []
+
+    def make_hook(label):
+        async def hook(original, target, content, **kwargs):
+            calls.append(label)
+            if label == "marks final" and content == "final":
+                kwargs["final"] = True
+
+            return await original(target, content, **kwargs)
+
+        return hook
+
+    hooks = {}
+    for label, priority, transform in (
+        ("plain 0", 0, False),
+        ("transform 0", 0, True),
+        ("plain 5", 5, False),
+        ("marks final", 5, True),
+        ("late plain 0", 0, False),
+        ("transform -1", -1, True),
+    ):
+        hooks[label] = _Target.hook(
+            "test_order", priority=priority, transform=transform
+        )(make_hook(label))
+
+    async def send(content):
+        calls.clear()
+
+        return await _Target().test_order(content)
+
+    try:
+        # higher priority first, last registered of equal priority wraps the
+        # ones registered before it, same as before priorities existed
+        order = [
+            "marks final",
+            "plain 5",
+            "late plain 0",
+            "transform 0",
+            "plain 0",
+            "transform -1",
+        ]
+        assert _Target.hook_chain("test_order") == [hooks[label] for label in order]
+
+        assert asyncio.run(send("message")) == ("message", {})
+        assert calls == order
+
+        assert asyncio.run(send("final")) == ("final", {})
+        assert calls == ["marks final", "plain 5", "late plain 0", "plain 0"]
+    finally:
+        for hook in list(_Target.__hooks__.get("test_order", [])):
+            _Target.remove_hook(hook)